@@ -3,11 +3,34 @@ AI Detection Avoidance Module
 
 This module implements techniques to make paraphrased text appear more human-written
 and less likely to be flagged by AI content detectors.
+
+By default the techniques run as separate passes over the document. In fused
+mode every enabled technique is applied to a sentence's word list in a single
+walk, and each changed sentence is joined back into a string once. Either
+way, a document's random decisions are drawn as one NumPy array per pass,
+with a row per sentence, and only the sentences the draws select are touched.
 """
 
-import random
 import re
-from nltk.tokenize import sent_tokenize
+
+import numpy as np
+
+import metrics
+from document import AnnotatedDocument
+from seeding import make_rng, numpy_rng
+from tokenization import get_tokenizer
+
+
+# Columns of the per-sentence decision rows
+(_FILLER, _FILLER_PICK, _FILLER_INSERT, _FILLER_POSITION, _FILLER_PREFIX,
+ _TRANSITION, _TRANSITION_PICK, _REMARK, _REMARK_PICK,
+ _COMBINE, _CONNECTOR_PICK, _UNCERTAINTY, _MARKER_PICK) = range(13)
+_DECISIONS = 13
+
+
+def _pick(options, draw):
+    """Choose from options with a uniform draw in [0, 1)."""
+    return options[int(draw * len(options))]
 
 
 class AIDetectionAvoider:
@@ -15,7 +38,17 @@ class AIDetectionAvoider:
     Techniques to make text less detectable as AI-generated.
     """
     
-    def __init__(self):
+    def __init__(self, fused=False, tokenizer=None):
+        """
+        Args:
+            fused: Apply all humanization techniques in one walk over the
+                sentences instead of one pass per technique (same kinds of
+                changes at the same rates, drawn in a different order)
+            tokenizer: Default tokenizer backend or its name (see tokenization)
+        """
+        self.fused = fused
+        self.tokenizer = get_tokenizer(tokenizer)
+        
         # Common human writing patterns (without first-person)
         self.filler_words = [
             "actually", "basically", "kind of", "sort of",
@@ -29,11 +62,33 @@ class AIDetectionAvoider:
             "Consequently,", "Meanwhile,", "Nevertheless,", "Still,"
         ]
         
+        self.parenthetical_remarks = [
+            "essentially",
+            "notably",
+            "importantly",
+            "significantly",
+        ]
+        
+        self.sentence_connectors = [", and", "; meanwhile,", ". Additionally,"]
+        
+        self.uncertainty_markers = [
+            "seems to",
+            "appears to",
+            "might",
+            "could",
+            "may",
+            "tends to",
+            "arguably",
+        ]
+        
+        # Verbs an uncertainty marker is placed before
+        self.uncertainty_verbs = frozenset(['is', 'are', 'was', 'were', 'be', 'been'])
+        
         self.common_typos = {
             "th": "th",  # No typos - just for structure
         }
     
-    def add_human_variations(self, text, intensity=0.5):
+    def add_human_variations(self, text, intensity=0.5, rng=None):
         """
         Add human-like variations such as:
         - Occasional informal language
@@ -42,149 +97,154 @@ class AIDetectionAvoider:
         - Imperfect but readable text
         - Preserves paragraph structure
         """
-        # Split by paragraphs (empty lines) to preserve structure
-        paragraphs = text.split('\n\n')
-        modified_paragraphs = []
+        doc = AnnotatedDocument(text, line_fallback=False, tokenizer=self.tokenizer)
+        self.add_human_variations_document(doc, intensity, rng)
+        return doc.render()
+    
+    def add_human_variations_document(self, doc, intensity=0.5, rng=None):
+        """Apply add_human_variations to each sentence of an annotated document."""
+        rng = make_rng(rng=rng)
+        sentences = [(sentence, i) for paragraph in doc.paragraphs
+                     for i, sentence in enumerate(paragraph.live_sentences())]
+        if not sentences:
+            return doc
         
-        for para in paragraphs:
-            sentences = sent_tokenize(para)
-            modified_sentences = []
-            
-            for i, sentence in enumerate(sentences):
-                modified = sentence
-                
-                # Occasionally add filler words (reduced frequency)
-                if random.random() < intensity * 0.1:
-                    filler = random.choice(self.filler_words)
-                    # Insert filler word at beginning or after first few words
-                    if len(modified.split()) > 5 and random.random() < 0.3:
-                        words = modified.split()
-                        insert_pos = random.randint(1, min(2, len(words)-1))
-                        words.insert(insert_pos, filler)
-                        modified = " ".join(words)
-                    elif modified[0].isupper() and random.random() < 0.2:
-                        modified = f"{filler} {modified[0].lower()}{modified[1:]}"
-                
-                # Occasionally use transition phrases (reduced)
-                if i > 0 and random.random() < intensity * 0.08:
-                    transition = random.choice(self.transition_phrases)
-                    if not modified.startswith(transition):
-                        transition_clean = transition.rstrip(',')
-                        modified = f"{transition_clean} {modified[0].lower()}{modified[1:] if len(modified) > 1 else ''}"
-                
-                # Add occasional parenthetical remarks (less frequent)
-                if len(modified.split()) > 8 and random.random() < intensity * 0.05:
-                    remarks = [
-                        "essentially",
-                        "notably",
-                        "importantly",
-                        "significantly",
-                    ]
-                    remark = random.choice(remarks)
-                    # Find a good place to insert - before the period
-                    if modified.endswith('.'):
-                        modified = modified[:-1] + f", {remark}."
-                    else:
-                        modified = f"{modified}, {remark}."
-                
-                modified_sentences.append(modified)
-            
-            modified_paragraphs.append(" ".join(modified_sentences))
+        draws = self._decisions(rng, len(sentences))
+        selected = ((draws[:, _FILLER] < intensity * 0.1)
+                    | (draws[:, _TRANSITION] < intensity * 0.08)
+                    | (draws[:, _REMARK] < intensity * 0.05))
+        for index in np.flatnonzero(selected).tolist():
+            sentence, i = sentences[index]
+            modified = self._vary_sentence(sentence.text, i, intensity, draws[index].tolist())
+            if modified != sentence.text:
+                sentence.update(modified)
+        
+        return doc
+    
+    def _decisions(self, rng, count):
+        """Draw count decision rows (see the column constants) as one NumPy array."""
+        return numpy_rng(rng).random((count, _DECISIONS))
+    
+    def _vary_sentence(self, sentence, i, intensity, decisions):
+        """Add filler words, transitions and remarks to the i-th sentence of a paragraph."""
+        modified = sentence
         
-        # Rejoin paragraphs with double newlines to preserve structure
-        return "\n\n".join(modified_paragraphs)
+        # Occasionally add filler words (reduced frequency)
+        if decisions[_FILLER] < intensity * 0.1:
+            filler = _pick(self.filler_words, decisions[_FILLER_PICK])
+            # Insert filler word at beginning or after first few words
+            if decisions[_FILLER_INSERT] < 0.3 and len(modified.split()) > 5:
+                words = modified.split()
+                insert_pos = 1 + int(decisions[_FILLER_POSITION] * min(2, len(words)-1))
+                words.insert(insert_pos, filler)
+                modified = " ".join(words)
+            elif modified[0].isupper() and decisions[_FILLER_PREFIX] < 0.2:
+                modified = f"{filler} {modified[0].lower()}{modified[1:]}"
+        
+        # Occasionally use transition phrases (reduced)
+        if i > 0 and decisions[_TRANSITION] < intensity * 0.08:
+            transition = _pick(self.transition_phrases, decisions[_TRANSITION_PICK])
+            if not modified.startswith(transition):
+                transition_clean = transition.rstrip(',')
+                modified = f"{transition_clean} {modified[0].lower()}{modified[1:] if len(modified) > 1 else ''}"
+        
+        # Add occasional parenthetical remarks (less frequent)
+        if decisions[_REMARK] < intensity * 0.05 and len(modified.split()) > 8:
+            remark = _pick(self.parenthetical_remarks, decisions[_REMARK_PICK])
+            # Find a good place to insert - before the period
+            if modified.endswith('.'):
+                modified = modified[:-1] + f", {remark}."
+            else:
+                modified = f"{modified}, {remark}."
+        
+        return modified
     
-    def vary_sentence_length(self, text):
+    def vary_sentence_length(self, text, rng=None):
         """Create varied sentence lengths (human pattern) while preserving paragraphs."""
-        # Split by paragraphs to preserve structure
-        paragraphs = text.split('\n\n')
-        varied_paragraphs = []
+        doc = AnnotatedDocument(text, line_fallback=False, tokenizer=self.tokenizer)
+        self.vary_sentence_length_document(doc, rng)
+        return doc.render()
+    
+    def vary_sentence_length_document(self, doc, rng=None):
+        """
+        Combine short neighbouring sentences of an annotated document.
+        The second sentence of a combined pair is left empty.
+        """
+        rng = make_rng(rng=rng)
+        paragraphs = [paragraph.live_sentences() for paragraph in doc.paragraphs]
+        total = sum(len(sentences) for sentences in paragraphs)
+        if not total:
+            return doc
+        decisions = self._decisions(rng, total).tolist()
         
-        for para in paragraphs:
-            sentences = sent_tokenize(para)
-            varied = []
+        row = 0
+        for sentences in paragraphs:
+            rows = decisions[row:row + len(sentences)]
+            row += len(sentences)
             
             i = 0
             while i < len(sentences):
-                sentence = sentences[i].strip()
-                
                 # Occasionally combine short sentences (human pattern)
-                if (i < len(sentences) - 1 and 
-                    len(sentence.split()) < 8 and 
-                    len(sentences[i+1].split()) < 8 and
-                    random.random() < 0.3):
+                if (rows[i][_COMBINE] < 0.3 and
+                    i < len(sentences) - 1 and 
+                    len(sentences[i].text.split()) < 8 and 
+                    len(sentences[i+1].text.split()) < 8):
                     
-                    next_sentence = sentences[i+1].strip()
-                    connector = random.choice([", and", "; meanwhile,", ". Additionally,"])
+                    sentence = sentences[i].text.strip()
+                    next_sentence = sentences[i+1].text.strip()
+                    connector = _pick(self.sentence_connectors, rows[i][_CONNECTOR_PICK])
                     
                     if sentence.endswith('.'):
                         sentence = sentence[:-1]
                     if next_sentence[0].isupper():
                         next_sentence = next_sentence[0].lower() + next_sentence[1:]
                     
-                    combined = f"{sentence}{connector} {next_sentence}"
-                    varied.append(combined)
+                    sentences[i].update(f"{sentence}{connector} {next_sentence}")
+                    sentences[i+1].update('')
                     i += 2
                     continue
                 
-                varied.append(sentence)
                 i += 1
-            
-            varied_paragraphs.append(" ".join(varied))
         
-        # Rejoin paragraphs with double newlines
-        return "\n\n".join(varied_paragraphs)
+        return doc
     
-    def add_uncertainty(self, text, intensity=0.3):
+    def add_uncertainty(self, text, intensity=0.3, rng=None):
         """Add subtle uncertainty markers (very human) while preserving paragraphs."""
-        # Split by paragraphs to preserve structure
-        paragraphs = text.split('\n\n')
-        modified_paragraphs = []
-        
-        uncertainty_markers = [
-            "seems to",
-            "appears to",
-            "might",
-            "could",
-            "may",
-            "tends to",
-            "arguably",
-        ]
+        doc = AnnotatedDocument(text, line_fallback=False, tokenizer=self.tokenizer)
+        self.add_uncertainty_document(doc, intensity, rng)
+        return doc.render()
+    
+    def add_uncertainty_document(self, doc, intensity=0.3, rng=None):
+        """Apply add_uncertainty to each sentence of an annotated document."""
+        rng = make_rng(rng=rng)
+        sentences = list(doc.sentences())
+        if not sentences:
+            return doc
         
-        for para in paragraphs:
-            sentences = sent_tokenize(para)
-            modified = []
-            
-            for sentence in sentences:
-                if random.random() < intensity * 0.2 and len(sentence.split()) > 5:
-                    # Find a verb and add uncertainty before it
-                    words = sentence.split()
-                    verb_pos = None
-                    
-                    for j, word in enumerate(words):
-                        if word.lower() in ['is', 'are', 'was', 'were', 'be', 'been']:
-                            verb_pos = j
-                            break
-                    
-                    if verb_pos and verb_pos > 0:
-                        marker = random.choice(uncertainty_markers)
-                        words.insert(verb_pos, marker)
-                        sentence = " ".join(words)
-                
-                modified.append(sentence)
-            
-            modified_paragraphs.append(" ".join(modified))
+        draws = self._decisions(rng, len(sentences))
+        for index in np.flatnonzero(draws[:, _UNCERTAINTY] < intensity * 0.2).tolist():
+            sentence = sentences[index]
+            if not sentence.text:
+                continue
+            # Find a verb and add uncertainty before it
+            words = sentence.text.split()
+            count = len(words)
+            self._add_uncertainty_words(words, intensity, draws[index].tolist())
+            if len(words) != count:
+                sentence.update(" ".join(words))
         
-        # Rejoin paragraphs with double newlines
-        return "\n\n".join(modified_paragraphs)
+        return doc
     
-    def humanize(self, text, intensity=0.6):
+    def humanize(self, text, intensity=0.6, seed=None, rng=None, tokenizer=None):
         """
         Main humanization method combining multiple techniques.
         
         Args:
             text: Input text to humanize
             intensity: Strength of humanization (0.0 to 1.0)
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
+            tokenizer: Tokenizer backend for this request (defaults to the avoider's)
         
         Returns:
             Humanized text
@@ -192,15 +252,181 @@ class AIDetectionAvoider:
         if not text or not text.strip():
             return text
         
-        result = text
+        with metrics.request('humanize'):
+            doc = AnnotatedDocument(text, line_fallback=False, tokenizer=tokenizer or self.tokenizer)
+            metrics.count('sentences', doc.sentence_count())
+            metrics.count('tokens', doc.source_word_count())
+            self.humanize_document(doc, intensity, seed, rng)
+            return doc.render()
+    
+    def humanize_document(self, doc, intensity=0.6, seed=None, rng=None, fused=None):
+        """
+        Humanize an annotated document in place.
+        
+        Args:
+            doc: AnnotatedDocument (usually already paraphrased)
+            intensity: Strength of humanization (0.0 to 1.0)
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
+            fused: Use the fused mode for this call (None for the avoider's setting)
+        
+        Returns:
+            The same document, updated
+        """
+        if doc.is_blank:
+            return doc
+        
+        rng = make_rng(seed, rng)
+        
+        if self.fused if fused is None else fused:
+            with metrics.stage('humanize.fused'):
+                return self.humanize_fused_document(doc, intensity, rng)
         
         # Apply techniques sequentially
-        result = self.add_human_variations(result, intensity)
+        with metrics.stage('humanize.variations'):
+            self.add_human_variations_document(doc, intensity, rng)
         
         if intensity > 0.4:
-            result = self.vary_sentence_length(result)
+            with metrics.stage('humanize.sentence_length'):
+                self.vary_sentence_length_document(doc, rng)
         
         if intensity > 0.6:
-            result = self.add_uncertainty(result, intensity)
+            with metrics.stage('humanize.uncertainty'):
+                self.add_uncertainty_document(doc, intensity, rng)
         
-        return result
+        return doc
+    
+    def humanize_fused_document(self, doc, intensity=0.6, rng=None):
+        """
+        Humanize an annotated document in a single walk over its sentences.
+        
+        Each sentence is split into words once; filler words, transitions,
+        remarks, sentence combining and uncertainty markers (each enabled at
+        the same intensity thresholds as humanize_document) are applied to
+        that word list, and the text of a sentence that changed is rebuilt
+        once at the end; unchanged sentences keep their original text and
+        spacing. Every random decision for the document is drawn up front as
+        one NumPy array with a row per sentence, and sentences whose row
+        selects no technique are not split at all (unless the sentence before
+        them is combined with them).
+        
+        Returns:
+            The same document, updated
+        """
+        rng = make_rng(rng=rng)
+        combine = intensity > 0.4
+        uncertainty = intensity > 0.6
+        
+        paragraphs = [paragraph.live_sentences() for paragraph in doc.paragraphs]
+        total = sum(len(sentences) for sentences in paragraphs)
+        if not total:
+            return doc
+        draws = self._decisions(rng, total)
+        selected = ((draws[:, _FILLER] < intensity * 0.1)
+                    | (draws[:, _TRANSITION] < intensity * 0.08)
+                    | (draws[:, _REMARK] < intensity * 0.05))
+        if combine:
+            selected |= draws[:, _COMBINE] < 0.3
+        if uncertainty:
+            selected |= draws[:, _UNCERTAINTY] < intensity * 0.2
+        decisions = draws.tolist()
+        selected = selected.tolist()
+        
+        row = 0
+        for sentences in paragraphs:
+            rows = decisions[row:row + len(sentences)]
+            active = selected[row:row + len(sentences)]
+            row += len(sentences)
+            original = [None] * len(sentences)
+            words = [None] * len(sentences)
+            
+            i = 0
+            while i < len(sentences):
+                if words[i] is None and not active[i]:
+                    i += 1
+                    continue
+                if words[i] is None:
+                    original[i] = sentences[i].text.split()
+                    words[i] = self._vary_words(list(original[i]), i, intensity, rows[i])
+                current = words[i]
+                consumed = 1
+                
+                if (combine and rows[i][_COMBINE] < 0.3 and current
+                        and i < len(sentences) - 1 and len(current) < 8):
+                    if words[i + 1] is None:
+                        original[i + 1] = sentences[i + 1].text.split()
+                        words[i + 1] = self._vary_words(list(original[i + 1]), i + 1,
+                                                        intensity, rows[i + 1])
+                    following = words[i + 1]
+                    if following and len(following) < 8:
+                        current = self._combine_words(current, following, rows[i][_CONNECTOR_PICK])
+                        consumed = 2
+                
+                if uncertainty:
+                    current = self._add_uncertainty_words(current, intensity, rows[i])
+                
+                # Only the words were changed, so an equal word list means
+                # nothing fired and the sentence keeps its own spacing
+                if consumed == 2 or current != original[i]:
+                    sentences[i].update(' '.join(current))
+                if consumed == 2:
+                    sentences[i + 1].update('')
+                i += consumed
+        
+        return doc
+    
+    def _vary_words(self, words, i, intensity, decisions):
+        """Word-list version of _vary_sentence (filler, transition, remark)."""
+        if not words:
+            return words
+        
+        if decisions[_FILLER] < intensity * 0.1:
+            filler = _pick(self.filler_words, decisions[_FILLER_PICK])
+            if len(words) > 5 and decisions[_FILLER_INSERT] < 0.3:
+                highest = min(2, len(words) - 1)
+                words.insert(1 + int(decisions[_FILLER_POSITION] * highest), filler)
+            elif words[0][0].isupper() and decisions[_FILLER_PREFIX] < 0.2:
+                words[0] = words[0][0].lower() + words[0][1:]
+                words.insert(0, filler)
+        
+        if i > 0 and decisions[_TRANSITION] < intensity * 0.08:
+            transition = _pick(self.transition_phrases, decisions[_TRANSITION_PICK]).split()
+            if words[:len(transition)] != transition:
+                words[0] = words[0][0].lower() + words[0][1:]
+                transition[-1] = transition[-1].rstrip(',')
+                words[:0] = transition
+        
+        if len(words) > 8 and decisions[_REMARK] < intensity * 0.05:
+            remark = _pick(self.parenthetical_remarks, decisions[_REMARK_PICK])
+            if words[-1].endswith('.'):
+                words[-1] = words[-1][:-1] + ','
+            else:
+                words[-1] += ','
+            words.append(remark + '.')
+        
+        return words
+    
+    def _combine_words(self, words, following, pick):
+        """Join two short sentences' word lists with a connector."""
+        parts = _pick(self.sentence_connectors, pick).split()
+        combined = list(words)
+        if combined[-1].endswith('.'):
+            combined[-1] = combined[-1][:-1]
+        combined[-1] += parts[0]
+        combined.extend(parts[1:])
+        first = following[0]
+        if first[0].isupper():
+            first = first[0].lower() + first[1:]
+        combined.append(first)
+        combined.extend(following[1:])
+        return combined
+    
+    def _add_uncertainty_words(self, words, intensity, decisions):
+        """Word-list version of the add_uncertainty rule for one sentence."""
+        if decisions[_UNCERTAINTY] < intensity * 0.2 and len(words) > 5:
+            for j, word in enumerate(words):
+                if word.lower() in self.uncertainty_verbs:
+                    if j > 0:
+                        words.insert(j, _pick(self.uncertainty_markers, decisions[_MARKER_PICK]))
+                    break
+        return words
@@ -0,0 +1,354 @@
+"""
+HTTP API Module
+
+A dependency-free ASGI application exposing the pipeline to other services:
+
+    POST /paraphrase  {"text", "intensity"?, "seed"?}             -> {"output"}
+    POST /humanize    {"text", "intensity"?, "seed"?}             -> {"output"}
+    POST /validate    {"original", "paraphrased"}                 -> {"validation"}
+    POST /process     {"text", "intensity"?, "humanize"?, "seed"?} -> {"output", "validation"}
+    GET  /health                                                  -> {"status", "in_flight"}
+
+/paraphrase, /humanize and /process also accept "tokenizer" ("nltk" or
+"fast") to pick the tokenizer backend for that request.
+
+Handlers never run NLP work on the event loop: every request is dispatched
+to a bounded parallel.EnginePool of pre-warmed workers. Bodies over the size
+limit get 413, requests beyond the queue limit get 429 right away, and work
+that exceeds the timeout gets 504.
+
+Serve it with any ASGI server, e.g.:
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+or exercise it in-process with LocalClient.
+"""
+
+import asyncio
+import json
+import os
+import threading
+
+from parallel import EnginePool
+from tokenization import TOKENIZERS
+
+
+DEFAULT_MAX_BODY_BYTES = 256 * 1024
+DEFAULT_TIMEOUT = 30.0
+
+# Tasks waiting for or running on a worker, per worker, before 429
+DEFAULT_QUEUE_PER_WORKER = 4
+
+_STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 429: 'Too Many Requests', 500: 'Internal Server Error',
+    504: 'Gateway Timeout',
+}
+
+
+class HTTPError(Exception):
+    """Turned into a JSON error response with the given status."""
+
+    def __init__(self, status, message=None):
+        self.status = status
+        super().__init__(message or _STATUS_TEXT.get(status, 'Error'))
+
+
+def _text_field(payload, name):
+    value = payload.get(name)
+    if not isinstance(value, str):
+        raise HTTPError(400, f"'{name}' must be a string")
+    return value
+
+
+def _intensity(payload):
+    value = payload.get('intensity', 0.6)
+    # bool is an int subclass, but true/false are not intensities
+    if (not isinstance(value, (int, float)) or isinstance(value, bool)
+            or not 0.0 <= value <= 1.0):
+        raise HTTPError(400, "'intensity' must be a number between 0 and 1")
+    return float(value)
+
+
+def _seed(payload):
+    value = payload.get('seed')
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise HTTPError(400, "'seed' must be an integer")
+    return value
+
+
+def _tokenizer(payload):
+    value = payload.get('tokenizer')
+    if value is not None and (not isinstance(value, str) or value not in TOKENIZERS):
+        raise HTTPError(400, f"'tokenizer' must be one of: {', '.join(TOKENIZERS)}")
+    return value
+
+
+def _humanize_flag(payload):
+    value = payload.get('humanize', True)
+    # A string such as "false" would otherwise be truthy
+    if not isinstance(value, bool):
+        raise HTTPError(400, "'humanize' must be true or false")
+    return value
+
+
+def _paraphrase_args(payload):
+    return 'paraphrase', (_text_field(payload, 'text'), _intensity(payload), _seed(payload),
+                          _tokenizer(payload))
+
+
+def _humanize_args(payload):
+    return 'humanize', (_text_field(payload, 'text'), _intensity(payload), _seed(payload),
+                        _tokenizer(payload))
+
+
+def _validate_args(payload):
+    return 'validate', (_text_field(payload, 'original'), _text_field(payload, 'paraphrased'))
+
+
+def _process_args(payload):
+    return 'process', (_text_field(payload, 'text'), _intensity(payload),
+                       _humanize_flag(payload), _seed(payload), _tokenizer(payload))
+
+
+# Path -> (parse payload into a pool task, shape the task result as a response)
+ROUTES = {
+    '/paraphrase': (_paraphrase_args, lambda output: {'output': output}),
+    '/humanize': (_humanize_args, lambda output: {'output': output}),
+    '/validate': (_validate_args, lambda validation: {'validation': validation}),
+    '/process': (_process_args, lambda result: {'output': result[0], 'validation': result[1]}),
+}
+
+
+class PipelineService:
+    """
+    The ASGI application. The worker pool is created on first use (or at
+    lifespan startup) unless one is passed in.
+    """
+
+    def __init__(self, pool=None, workers=None, max_body_bytes=DEFAULT_MAX_BODY_BYTES,
+                 timeout=DEFAULT_TIMEOUT, max_pending=None):
+        """
+        Args:
+            pool: parallel.EnginePool to dispatch to (created if None)
+            workers: Worker count for the pool created here
+            max_body_bytes: Largest accepted request body
+            timeout: Seconds a request may take before 504
+            max_pending: Tasks allowed on the pool before 429 (defaults to
+                DEFAULT_QUEUE_PER_WORKER per worker); a task keeps its slot
+                until the worker finishes it, even after its request timed out
+        """
+        self._pool = pool
+        self._owns_pool = pool is None
+        self.workers = pool.workers if pool is not None else (workers or os.cpu_count() or 1)
+        self.max_body_bytes = max_body_bytes
+        self.timeout = timeout
+        self.max_pending = max_pending or self.workers * DEFAULT_QUEUE_PER_WORKER
+        self.in_flight = 0
+        # Slots are released from pool callbacks, which run on other threads
+        self._slots = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = EnginePool(self.workers)
+        return self._pool
+
+    def startup(self):
+        self.pool.warm_up()
+
+    def shutdown(self):
+        if self._owns_pool and self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        try:
+            status, body = 200, await self._handle(scope, receive)
+        except HTTPError as e:
+            status, body = e.status, {'error': str(e)}
+        except Exception as e:
+            status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+        await self._respond(send, status, body)
+
+    async def _lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await loop.run_in_executor(None, self.startup)
+                except Exception as e:
+                    # The server reports the message and exits instead of
+                    # serving from a pool that could not warm up
+                    await loop.run_in_executor(None, self.shutdown)
+                    await send({'type': 'lifespan.startup.failed',
+                                'message': f"{type(e).__name__}: {e}"})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await loop.run_in_executor(None, self.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle(self, scope, receive):
+        path, method = scope['path'], scope['method']
+        if path == '/health':
+            if method != 'GET':
+                raise HTTPError(405)
+            return {'status': 'ok', 'in_flight': self.in_flight, 'max_pending': self.max_pending}
+
+        route = ROUTES.get(path)
+        if route is None:
+            raise HTTPError(404)
+        if method != 'POST':
+            raise HTTPError(405)
+
+        payload = await self._read_json(scope, receive)
+        parse, shape = route
+        name, args = parse(payload)
+
+        # Backpressure: refuse instead of queueing without bound. A running
+        # task cannot be stopped, so its slot is only freed once the worker
+        # is done with it, not when the request gives up waiting.
+        with self._slots:
+            if self.in_flight >= self.max_pending:
+                raise HTTPError(429, "Too many requests in flight, retry later")
+            self.in_flight += 1
+        try:
+            future = self.pool.submit(name, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise HTTPError(504, f"Request took longer than {self.timeout:g}s")
+        return shape(result)
+
+    def _release(self, future=None):
+        with self._slots:
+            self.in_flight -= 1
+
+    async def _read_json(self, scope, receive):
+        for name, value in scope.get('headers', ()):
+            if name.lower() != b'content-length':
+                continue
+            try:
+                length = int(value)
+            except ValueError:
+                raise HTTPError(400, "Invalid Content-Length header")
+            if length > self.max_body_bytes:
+                raise HTTPError(413, f"Request body exceeds {self.max_body_bytes} bytes")
+
+        chunks = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise HTTPError(413, f"Request body exceeds {self.max_body_bytes} bytes")
+            chunks.append(chunk)
+            more = message.get('more_body', False)
+
+        try:
+            payload = json.loads(b''.join(chunks) or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return payload
+
+    async def _respond(self, send, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(data)).encode('ascii'))],
+        })
+        await send({'type': 'http.response.body', 'body': data})
+
+
+class LocalClient:
+    """
+    Calls an ASGI app in-process, without a server or sockets:
+
+        client = LocalClient(PipelineService(pool=EnginePool(2, processes=False)))
+        status, body = client.post('/paraphrase', {'text': 'Some text.'})
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method, path, payload=None, body=None):
+        """
+        Send one request.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            payload: JSON-serializable body
+            body: Raw body bytes (overrides payload)
+
+        Returns:
+            Tuple of (status code, decoded JSON body)
+        """
+        return asyncio.run(self.request_async(method, path, payload, body))
+
+    async def request_async(self, method, path, payload=None, body=None):
+        """Coroutine version of request(), for issuing concurrent requests."""
+        if body is None:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode('ascii'))],
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        await self.app(scope, receive, send)
+        status = next(m['status'] for m in sent if m['type'] == 'http.response.start')
+        data = b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+        return status, json.loads(data)
+
+    def get(self, path):
+        return self.request('GET', path)
+
+    def post(self, path, payload):
+        return self.request('POST', path, payload)
+
+
+def create_app():
+    """
+    Build the service from the environment: $PARAPHRASER_API_WORKERS,
+    $PARAPHRASER_API_TIMEOUT and $PARAPHRASER_API_MAX_BODY.
+    """
+    return PipelineService(
+        workers=int(os.environ.get('PARAPHRASER_API_WORKERS', 0)) or None,
+        timeout=float(os.environ.get('PARAPHRASER_API_TIMEOUT', DEFAULT_TIMEOUT)),
+        max_body_bytes=int(os.environ.get('PARAPHRASER_API_MAX_BODY', DEFAULT_MAX_BODY_BYTES)),
+    )
+
+
+app = create_app()
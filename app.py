@@ -1,7 +1,12 @@
 import streamlit as st
-import nltk
 from paraphraser import ParaphraserEngine, SemanticValidator
 from ai_avoider import AIDetectionAvoider
+from pipeline import BestOf, EditSession, Pipeline
+from parallel import EnginePool
+from cache import get_result_cache_from_env
+from resources import get_resources
+from tokenization import TOKENIZERS
+import metrics
 import os
 
 # Set page config
@@ -127,33 +132,16 @@ st.markdown(f"""
 # Initialize NLTK
 @st.cache_resource
 def setup_nltk():
-    """Download required NLTK data"""
+    """Download any missing NLTK data (the engines themselves never download)"""
+    resources = get_resources()
     nltk_data_path = os.path.join(os.getcwd(), "nltk_data")
-    if nltk_data_path not in nltk.data.path:
-        nltk.data.path.append(nltk_data_path)
+    resources.add_data_path(nltk_data_path)
     
-    # List of required packages
-    required_packages = [
-        'punkt', 
-        'punkt_tab', 
-        'wordnet', 
-        'omw-1.4', 
-        'averaged_perceptron_tagger', 
-        'averaged_perceptron_tagger_eng', 
-        'stopwords'
-    ]
-    
-    for package in required_packages:
-        try:
-            if 'punkt' in package:
-                nltk.data.find(f'tokenizers/{package}')
-            elif 'wordnet' in package or 'omw' in package or 'stopwords' in package:
-                nltk.data.find(f'corpora/{package}')
-            elif 'tagger' in package:
-                nltk.data.find(f'taggers/{package}')
-        except LookupError:
-            nltk.download(package, download_dir=nltk_data_path, quiet=True)
-            nltk.download(package, quiet=True)
+    missing = resources.missing()
+    if missing:
+        missing = resources.download(missing, download_dir=nltk_data_path)
+    if missing:
+        st.warning(f"Missing NLTK data: {', '.join(missing)}")
             
     return True
 
@@ -162,13 +150,27 @@ def setup_nltk():
 def load_engines():
     try:
         engine = ParaphraserEngine()
-        avoider = AIDetectionAvoider()
-        validator = SemanticValidator()
+        avoider = AIDetectionAvoider(fused=True)
+        validator = SemanticValidator(tagger=engine.tagger)
         return engine, avoider, validator
     except Exception as e:
         st.error(f"Error initializing engines: {e}")
         return None, None, None
 
+# Results of earlier runs; persisted to disk when $PARAPHRASER_CACHE is set
+@st.cache_resource
+def load_result_cache():
+    return get_result_cache_from_env()
+
+# Worker processes that generate best-of-N candidates in parallel; started
+# on the first request with several candidates ($PARAPHRASER_APP_WORKERS,
+# default: one per CPU)
+@st.cache_resource
+def load_pool():
+    pool = EnginePool(int(os.environ.get('PARAPHRASER_APP_WORKERS', 0)) or None)
+    pool.warm_up()
+    return pool
+
 # Main App logic
 def main():
     # Header with title and toggle
@@ -197,6 +199,14 @@ def main():
         st.header("Settings")
         intensity = st.slider("Intensity", 0.1, 1.0, 0.6, 0.1)
         humanize = st.checkbox("Humanize (AI Avoidance)", value=True)
+        candidates = st.slider("Candidates per paragraph", 1, 8, 1,
+                               help="Generate several versions of each paragraph and keep the one that best preserves the meaning")
+        tokenizer = st.selectbox("Tokenizer", list(TOKENIZERS), index=0,
+                                 help="'fast' is a regex tokenizer that matches NLTK on typical prose at a fraction of the cost")
+        budget = 0.0
+        if candidates > 1:
+            budget = st.number_input("Latency budget (seconds, 0 = none)", 0.0, 120.0, 10.0, 1.0,
+                                     help="Stop generating extra candidates once this much time has passed")
         
         st.markdown(f"""
         <div style='background-color: {current_theme['input_bg']}; padding: 15px; border-radius: 12px; margin-top: 20px; border: 1px solid {current_theme['card_border']}'>
@@ -210,6 +220,9 @@ def main():
         """, unsafe_allow_html=True)
         
         st.markdown("---")
+        show_debug = st.checkbox("Show debug metrics", value=False)
+        # Filled in after processing so it shows the request that just ran
+        debug_area = st.empty()
         st.caption("Runs locally with Python")
 
     # Main Area
@@ -226,27 +239,49 @@ def main():
     # Processing State
     if 'output_text' not in st.session_state:
         st.session_state.output_text = ""
+    if 'edit_session' not in st.session_state:
+        # Remembers the last run so only edited paragraphs are reprocessed
+        st.session_state.edit_session = EditSession()
+
+    with col2:
+        st.subheader("Result")
+        output_area = st.empty()
 
     if process_btn and input_text:
+        pipeline = Pipeline(engine, avoider, validator, result_cache=load_result_cache())
         with st.spinner("Processing..."):
             try:
-                # Step 1: Paraphrase
-                result = engine.paraphrase(input_text, intensity)
-                
-                # Step 2: Humanize
-                if humanize:
-                    result = avoider.humanize(result, intensity)
+                pool = load_pool() if candidates > 1 else None
+                # Each paragraph goes through paraphrase -> humanize -> improve
+                # and is shown as soon as it is finished
+                paragraphs = []
+                with metrics.request('pipeline') as trace:
+                    best_of = BestOf(candidates, budget or None) if candidates > 1 else None
+                    for paragraph in pipeline.stream(input_text, intensity, humanize, pool=pool,
+                                                     session=st.session_state.edit_session,
+                                                     best_of=best_of, tokenizer=tokenizer):
+                        paragraphs.append(paragraph)
+                        output_area.text_area("Output", value="\n\n".join(paragraphs), height=400,
+                                              label_visibility="collapsed", key=f"output_partial_{len(paragraphs)}")
                 
-                # Step 3: Improve
-                result = validator.improve_paraphrase(input_text, result, engine)
-                
-                st.session_state.output_text = result
+                st.session_state.output_text = "\n\n".join(paragraphs)
+                st.session_state.last_trace = trace.to_dict()
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
 
+    if show_debug and st.session_state.get('last_trace'):
+        last = st.session_state.last_trace
+        with debug_area.container():
+            st.markdown(f"**Last request:** {last['seconds'] * 1000:.0f} ms")
+            st.dataframe(
+                [{"stage": name, "ms": round(seconds * 1000, 1), "calls": last['calls'][name]}
+                 for name, seconds in sorted(last['stages'].items(), key=lambda item: item[1], reverse=True)],
+                hide_index=True, use_container_width=True
+            )
+            st.json({**last['counters'], **last['gauges']})
+
     with col2:
-        st.subheader("Result")
-        st.text_area("Output", value=st.session_state.output_text, height=400, label_visibility="collapsed")
+        output_area.text_area("Output", value=st.session_state.output_text, height=400, label_visibility="collapsed")
         
         if st.session_state.output_text:
             st.success("Processing complete!")
@@ -0,0 +1,426 @@
+"""
+Benchmark Suite
+
+Times each pipeline stage and the full pipeline on fixed-seed corpora, from a
+single paragraph up to a 1 MB document, and records peak memory per stage.
+Corpora are either synthetic (generated from a fixed seed) or built from the
+bundled bench_corpus.txt, so every run measures exactly the same input and
+nothing touches the network. Results can be saved as a baseline; later runs
+are compared against it and fail when a stage regresses past a threshold.
+
+    python bench.py --save-baseline              # record bench_baseline.json
+    python bench.py                              # compare, exit 1 on regression
+    python bench.py --sizes paragraph 1mb --stages pipeline humanize
+    python bench.py --tokenizers                 # fast vs NLTK tokenizer parity and speedup
+                                                 # (on the corpora and on TOKENIZER_CASES)
+    python bench.py --detokenizer                # splice/join round trips, exit 1 on a mismatch
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from ai_avoider import AIDetectionAvoider
+from document import AnnotatedDocument
+from paraphraser import ParaphraserEngine, SemanticValidator
+from pipeline import Pipeline
+from tokenization import TOKENIZERS, get_tokenizer
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, 'bench_corpus.txt')
+BASELINE_PATH = os.path.join(HERE, 'bench_baseline.json')
+
+# Target document sizes in bytes
+SIZES = {
+    'paragraph': 600,
+    '10kb': 10 * 1024,
+    '100kb': 100 * 1024,
+    '1mb': 1024 * 1024,
+}
+DEFAULT_SIZES = ('paragraph', '10kb', '100kb')
+
+CORPORA = ('synthetic', 'bundled')
+
+# Allowed slowdown (and memory growth) relative to the baseline
+DEFAULT_THRESHOLD = 0.25
+
+SEED = 1234
+
+# Sentences outside plain prose (URLs, email addresses, domains, dotted words,
+# numbers, clitics and quotes) checked for tokenizer parity on their own
+TOKENIZER_CASES = [
+    "Mail a@b.com.",
+    "Contact john.doe@mail.example.co.uk or x@y.io, please.",
+    "Visit www.example.com now.",
+    "Go to example.org.",
+    "See https://example.com/a/b?x=1 for details.",
+    "Use node.js and v1.2.3, i.e. the latest release.",
+    "The U.S. economy grew.",
+    "Ask Mr. Smith about it.",
+    "It costs $3.88 (roughly 3,36 euros) at 10:30.",
+    "The 1.5m figure is 20% of 7.5bn.",
+    "Use and/or as a well-known rule -- sometimes.",
+    "It's the students' 'best' day.",
+    "They don't know, can't say and cannot tell.",
+    "Rock'n'roll starts at eight o'clock.",
+    "He said \"hello\" to them... twice?!",
+]
+
+# Sentences both detokenizers must rebuild exactly: the splice after a word
+# is replaced, and join_tokens_properly from the tokens alone
+DETOKENIZER_CASES = [
+    "It's the students' 'best' day.",
+    "He said 'hi' to the students' parents.",
+    "It was 'fine', they said.",
+    "She said, \"We don't know.\"",
+    "The (big) dog's bone -- really?",
+    "They can't agree; it isn't clear, and we'll see.",
+]
+
+# Spacing only the splice keeps (the join normalizes whitespace)
+SPLICE_CASES = [
+    "The team  (and  others)\tcan't agree.",
+]
+
+_SUBJECTS = ['The team', 'Most users', 'The new system', 'Our analysis', 'The report',
+             'Each student', 'The committee', 'This approach', 'The market', 'Researchers']
+_VERBS = ['shows', 'improves', 'requires', 'explains', 'changes', 'supports',
+          'reduces', 'describes', 'affects', 'highlights']
+_ADJECTIVES = ['important', 'large', 'simple', 'difficult', 'significant', 'quick',
+               'effective', 'common', 'complex', 'useful']
+_OBJECTS = ['results', 'costs', 'problems', 'methods', 'decisions', 'changes',
+            'documents', 'questions', 'benefits', 'risks']
+_TAILS = ['every day', 'in most cases', 'over time', 'for many people',
+          'across the region', 'during the project', 'without much effort']
+_EXTRAS = ["It's not always clear why.", "They don't agree on the details.",
+           "\"This matters,\" one reviewer said.", "Is this the best way?",
+           "The effect can't be ignored."]
+
+
+def synthetic_text(size, seed=SEED):
+    """Generate about size bytes of paragraphs from a fixed seed."""
+    rng = random.Random(seed)
+    paragraphs = []
+    total = 0
+    while total < size:
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            if rng.random() < 0.15:
+                sentences.append(rng.choice(_EXTRAS))
+                continue
+            sentences.append(
+                f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_ADJECTIVES)} "
+                f"{rng.choice(_OBJECTS)} {rng.choice(_TAILS)}."
+            )
+        paragraph = ' '.join(sentences)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def bundled_text(size, path=CORPUS_PATH):
+    """Repeat the bundled corpus paragraph by paragraph up to about size bytes."""
+    with open(path, encoding='utf-8') as handle:
+        source = [p.strip() for p in handle.read().split('\n\n') if p.strip()]
+    paragraphs = []
+    total = 0
+    index = 0
+    while total < size:
+        paragraph = source[index % len(source)]
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+        index += 1
+    return '\n\n'.join(paragraphs)
+
+
+def make_corpus(kind, size_name):
+    size = SIZES[size_name]
+    return synthetic_text(size) if kind == 'synthetic' else bundled_text(size)
+
+
+class Stages:
+    """
+    The benchmarked stages over shared engines. Each stage is a factory that
+    takes the input text, does any untimed preparation, and returns the
+    callable to time.
+    """
+
+    def __init__(self):
+        self.engine = ParaphraserEngine()
+        self.avoider = AIDetectionAvoider()
+        self.validator = SemanticValidator(tagger=self.engine.tagger)
+        self.pipeline = Pipeline(self.engine, self.avoider, self.validator)
+
+    def segment(self, text):
+        return lambda: AnnotatedDocument(text, tokenizer=self.engine.tokenizer)
+
+    def get_synonyms(self, text):
+        doc = self.engine.annotate(text)
+        doc.annotate(self.engine.tagger)
+        pairs = [(token, tag) for sentence in doc.sentences()
+                 for token, tag in zip(sentence.tokens, sentence.tags)]
+
+        def run():
+            # Cold cache, so each repeat measures the same work
+            self.engine.synonym_cache.clear()
+            for token, tag in pairs:
+                self.engine.get_synonyms(token, tag)
+        return run
+
+    def replace_with_synonyms(self, text):
+        return lambda: self.engine.replace_with_synonyms(text, 0.6, rng=random.Random(SEED))
+
+    def join_tokens_properly(self, text):
+        doc = self.engine.annotate(text)
+        token_lists = [sentence.tokens for sentence in doc.sentences()]
+        return lambda: [self.engine.join_tokens_properly(tokens) for tokens in token_lists]
+
+    def add_variations(self, text):
+        return lambda: self.engine.add_variations(text, rng=random.Random(SEED))
+
+    def filter_content(self, text):
+        return lambda: self.engine.filter_content(text)
+
+    def humanize(self, text):
+        return lambda: self.avoider.humanize(text, 0.8, seed=SEED)
+
+    def improve_paraphrase(self, text):
+        paraphrased = self.engine.paraphrase(text, 0.6, seed=SEED)
+        return lambda: self.validator.improve_paraphrase(text, paraphrased, self.engine, seed=SEED)
+
+    def pipeline_run(self, text):
+        return lambda: self.pipeline.run(text, 0.6, seed=SEED)
+
+
+# Stage name -> Stages method
+STAGES = {
+    'segment': Stages.segment,
+    'get_synonyms': Stages.get_synonyms,
+    'replace_with_synonyms': Stages.replace_with_synonyms,
+    'join_tokens_properly': Stages.join_tokens_properly,
+    'add_variations': Stages.add_variations,
+    'filter_content': Stages.filter_content,
+    'humanize': Stages.humanize,
+    'improve_paraphrase': Stages.improve_paraphrase,
+    'pipeline': Stages.pipeline_run,
+}
+
+
+def measure(run, repeat):
+    """
+    Time run() repeat times and measure its peak traced memory once.
+
+    Returns:
+        Dict with median/min seconds and peak memory in KiB
+    """
+    run()  # warm caches and lazily loaded resources
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_s': round(statistics.median(times), 6),
+        'min_s': round(min(times), 6),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_suite(stages=None, sizes=DEFAULT_SIZES, corpora=CORPORA, repeat=3, log=sys.stderr):
+    """
+    Benchmark every (corpus, size, stage) combination.
+
+    Returns:
+        Dict mapping "corpus/size/stage" to the measure() result
+    """
+    suite = Stages()
+    results = {}
+    for kind in corpora:
+        for size_name in sizes:
+            text = make_corpus(kind, size_name)
+            # Large inputs take long enough that one timed run is representative
+            runs = repeat if len(text) <= SIZES['10kb'] else 1
+            for name in (stages or STAGES):
+                key = f"{kind}/{size_name}/{name}"
+                results[key] = measure(STAGES[name](suite, text), runs)
+                if log:
+                    log.write(f"{key:45s} {results[key]['median_s'] * 1000:10.2f} ms "
+                              f"{results[key]['peak_kib']:10.1f} KiB\n")
+    return results
+
+
+def tokenizer_report(text, repeat=3, candidate='fast', reference='nltk'):
+    """
+    Check a tokenizer backend against the reference on text and time both.
+
+    Returns:
+        Dict with the share of reference sentence boundaries the candidate
+        finds, the share of reference sentences it tokenizes identically,
+        the median seconds to segment and tokenize the text with each
+        backend, and the speedup
+    """
+    fast, slow = get_tokenizer(candidate), get_tokenizer(reference)
+    sentences = same_tokens = same_bounds = 0
+    for paragraph in text.split('\n\n'):
+        reference_spans = list(slow.sentence_spans(paragraph))
+        candidate_spans = set(fast.sentence_spans(paragraph))
+        for start, end in reference_spans:
+            sentence = paragraph[start:end]
+            sentences += 1
+            same_bounds += (start, end) in candidate_spans
+            same_tokens += fast.tokenize(sentence) == slow.tokenize(sentence)
+
+    seconds = {name: measure(lambda: AnnotatedDocument(text, tokenizer=name), repeat)['median_s']
+               for name in (reference, candidate)}
+    return {
+        'sentences': sentences,
+        'sentence_parity': round(same_bounds / sentences, 4) if sentences else 1.0,
+        'token_parity': round(same_tokens / sentences, 4) if sentences else 1.0,
+        f'{reference}_s': seconds[reference],
+        f'{candidate}_s': seconds[candidate],
+        'speedup': round(seconds[reference] / seconds[candidate], 2) if seconds[candidate] else None,
+    }
+
+
+def tokenizer_cases_report(cases=TOKENIZER_CASES, candidate='fast', reference='nltk'):
+    """
+    Check a tokenizer backend against the reference on single sentences.
+
+    Returns:
+        Dict with the share of cases tokenized identically and the cases
+        that differ
+    """
+    fast, slow = get_tokenizer(candidate), get_tokenizer(reference)
+    mismatches = [case for case in cases if fast.tokenize(case) != slow.tokenize(case)]
+    return {
+        'sentences': len(cases),
+        'token_parity': round(1 - len(mismatches) / len(cases), 4) if cases else 1.0,
+        'mismatches': mismatches,
+    }
+
+
+def detokenizer_report(engine, tokenizer=None):
+    """
+    Round-trip DETOKENIZER_CASES and SPLICE_CASES through both detokenizers.
+
+    Returns:
+        Dict with the cases join_tokens_properly rebuilds differently and
+        the cases that differ after splicing in an upper-cased first word
+    """
+    tokenizer = get_tokenizer(tokenizer or engine.tokenizer)
+    joined = [case for case in DETOKENIZER_CASES
+              if engine.join_tokens_properly(tokenizer.tokenize(case)) != case]
+    spliced = []
+    for case in DETOKENIZER_CASES + SPLICE_CASES:
+        doc = AnnotatedDocument(case, tokenizer=tokenizer)
+        sentence = next(doc.sentences())
+        tokens = list(sentence.tokens)
+        first = next(i for i, token in enumerate(tokens) if token.isalpha())
+        expected = case.replace(tokens[first], tokens[first].upper(), 1)
+        tokens[first] = tokens[first].upper()
+        sentence.replace_tokens(tokens, None, engine.join_tokens_properly)
+        if doc.render() != expected:
+            spliced.append(case)
+    return {'tokenizer': tokenizer.name, 'join_mismatches': joined, 'splice_mismatches': spliced}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results against a baseline.
+
+    Returns:
+        List of (key, metric, baseline value, current value) regressions
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ('median_s', 'peak_kib'):
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append((key, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), help="Stages to run (default: all)")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument('--corpora', nargs='+', choices=CORPORA, default=list(CORPORA))
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per small input")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed regression as a fraction (0.25 = 25%% slower)")
+    parser.add_argument('--output', help="Also write results to this JSON file")
+    parser.add_argument('--tokenizers', action='store_true',
+                        help="Report fast tokenizer parity and speedup instead")
+    parser.add_argument('--detokenizer', action='store_true',
+                        help="Check that sentences survive the splice and token join unchanged instead")
+    args = parser.parse_args(argv)
+
+    if args.detokenizer:
+        engine = ParaphraserEngine()
+        failed = False
+        for name in TOKENIZERS:
+            report = detokenizer_report(engine, name)
+            print(json.dumps(report))
+            failed = failed or bool(report['join_mismatches'] or report['splice_mismatches'])
+        return 1 if failed else 0
+
+    if args.tokenizers:
+        for kind in args.corpora:
+            for size_name in args.sizes:
+                report = tokenizer_report(make_corpus(kind, size_name), args.repeat)
+                print(json.dumps({'corpus': f"{kind}/{size_name}", **report}))
+        print(json.dumps({'corpus': 'cases', **tokenizer_cases_report()}))
+        return 0
+
+    results = run_suite(args.stages, args.sizes, args.corpora, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as handle:
+                baseline = json.load(handle)
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+        print(f"Saved baseline for {len(results)} measurements to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    regressions = compare(results, baseline, args.threshold)
+    for key, metric, previous, current in regressions:
+        print(f"REGRESSION {key} {metric}: {previous} -> {current}")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} in {len(results)} measurements")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Cache Module
+
+Bounded caches shared by the engines. Engines are long-lived (app.py keeps
+them in st.cache_resource), so every cache here has a size limit and reports
+its hit rate. ResultCache stores whole pipeline results keyed on their
+inputs, optionally persisted to SQLite so they survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_RESULT_CACHE_SIZE = 256
+DEFAULT_DISK_CACHE_BYTES = 64 * 1024 * 1024
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with a fixed number of entries.
+    Counts hits, misses and evictions so the size can be tuned from real numbers.
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        Args:
+            maxsize: Maximum number of entries (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return hits, misses, evictions, size and hit rate as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def result_key(text, intensity, humanize, seed, version):
+    """
+    Content-addressed key for a full pipeline run.
+
+    Args:
+        text: Input text
+        intensity: Strength of paraphrasing/humanization
+        humanize: Whether AI-detection avoidance was applied
+        seed: Request seed (None is a valid key component)
+        version: Fingerprint of the lexicon/policy the result was built with
+
+    Returns:
+        Hex digest identifying the result
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    header = json.dumps([round(float(intensity), 4), bool(humanize), seed, version])
+    digest.update(header.encode('utf-8') + b'\0')
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value store for results that should survive restarts.
+    Values are JSON; the least recently used rows are evicted once the stored
+    values exceed max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_DISK_CACHE_BYTES):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            max_bytes: Upper bound on the total size of stored values
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+            ' size INTEGER NOT NULL, accessed REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+    def get(self, key, default=None):
+        """Return the stored value for key, or default."""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return default
+            self._conn.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Store a JSON-serializable value and evict old rows if over budget."""
+        data = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                (key, data, len(data), time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM results ORDER BY accessed').fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany('DELETE FROM results WHERE key = ?', doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM results')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    Two-tier cache of full pipeline results: an in-memory LRU in front of an
+    optional DiskCache. Disk hits are promoted into memory.
+    """
+
+    def __init__(self, maxsize=DEFAULT_RESULT_CACHE_SIZE, path=None,
+                 max_bytes=DEFAULT_DISK_CACHE_BYTES):
+        """
+        Args:
+            maxsize: Number of results kept in memory
+            path: SQLite file for the persistent tier (None keeps results in
+                memory only)
+            max_bytes: Size budget of the persistent tier
+        """
+        self.memory = LRUCache(maxsize)
+        self.disk = DiskCache(path, max_bytes) if path else None
+        self.disk_hits = 0
+
+    def get(self, key):
+        """Return the cached result for key, or None."""
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.disk_hits += 1
+            self.memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """Memory-tier stats plus disk hits and size."""
+        stats = self.memory.stats()
+        stats['disk_hits'] = self.disk_hits
+        stats['disk_size'] = len(self.disk) if self.disk is not None else 0
+        return stats
+
+
+def get_result_cache_from_env():
+    """
+    Build a ResultCache whose persistent tier lives at $PARAPHRASER_CACHE
+    (memory only if the variable is unset).
+    """
+    return ResultCache(path=os.environ.get('PARAPHRASER_CACHE') or None)
@@ -0,0 +1,286 @@
+"""
+Batch Command-Line Interface
+
+Runs the paraphrase -> humanize -> improve pipeline over files, directory
+trees or JSONL streams without the Streamlit app, and writes one JSON
+record per document (output text and validation scores) as soon as it is
+finished:
+
+    python cli.py docs/ --output results.jsonl --workers 8
+    python cli.py corpus.jsonl --output results.jsonl --resume
+    cat corpus.jsonl | python cli.py - > results.jsonl
+
+Each input document is identified by an id (its path, or the JSONL id
+field), so an interrupted run restarted with --resume skips every document
+already in the output file. Throughput (docs/s and tokens/s) is reported
+on stderr as JSON lines.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+
+from paraphraser import ParaphraserEngine
+from pipeline import Pipeline
+from tokenization import TOKENIZERS
+
+
+# Validation fields copied into each output record
+VALIDATION_FIELDS = (
+    'similarity_score', 'length_similarity', 'original_key_terms',
+    'preserved_terms', 'semantic_match', 'quality_status',
+)
+
+
+def _read_jsonl(handle, source, text_field, id_field):
+    """
+    Yield (id, text) per JSONL line. A line that is not a JSON object or
+    whose text is not a string yields a ValueError naming the source and
+    line in place of the text, so one bad line does not abort the batch.
+    """
+    for line_number, line in enumerate(handle, 1):
+        line = line.strip()
+        if not line:
+            continue
+        location = f"{source}:{line_number}"
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield location, ValueError(f"{location}: invalid JSON ({e})")
+            continue
+        if not isinstance(record, dict):
+            yield location, ValueError(f"{location}: expected a JSON object")
+            continue
+        key = record.get(id_field)
+        key = str(key) if key is not None else location
+        text = record.get(text_field, '')
+        if not isinstance(text, str):
+            text = ValueError(f"{location}: '{text_field}' must be a string")
+        yield key, text
+
+
+def _read_file(path):
+    with open(path, encoding='utf-8') as handle:
+        return handle.read()
+
+
+def iter_documents(paths, pattern='*.txt', text_field='text', id_field='id'):
+    """
+    Lazily yield (id, text) for every input document. For an unreadable
+    JSONL line the text is a ValueError describing it.
+
+    Args:
+        paths: Files, directories (searched recursively for pattern), .jsonl
+            files, or '-' for JSONL on stdin
+        pattern: Filename pattern matched inside directories
+        text_field: JSONL field holding the text
+        id_field: JSONL field holding the document id (falls back to
+            "<file>:<line>")
+    """
+    for path in paths:
+        if path == '-':
+            yield from _read_jsonl(sys.stdin, 'stdin', text_field, id_field)
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(fnmatch.filter(files, pattern)):
+                    file_path = os.path.join(root, name)
+                    yield file_path, _read_file(file_path)
+        elif path.endswith('.jsonl'):
+            with open(path, encoding='utf-8') as handle:
+                yield from _read_jsonl(handle, path, text_field, id_field)
+        else:
+            yield path, _read_file(path)
+
+
+def completed_ids(output_path):
+    """
+    Ids of documents already written successfully to output_path. A
+    trailing partial line left by an interrupted run is cut off so new
+    records are appended cleanly.
+    """
+    if not output_path or not os.path.exists(output_path):
+        return set()
+
+    done = set()
+    with open(output_path, 'rb+') as handle:
+        data = handle.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            handle.truncate(complete)
+    for line in data[:complete].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if 'error' not in record and 'id' in record:
+            done.add(record['id'])
+    return done
+
+
+def make_record(key, text, result):
+    """Build the output record for one document."""
+    record = {'id': key, 'tokens': len(text.split())}
+    if isinstance(result, Exception):
+        record['error'] = f"{type(result).__name__}: {result}"
+        return record
+    output, validation = result
+    record['output'] = output
+    if validation is not None:
+        record['validation'] = {field: validation[field] for field in VALIDATION_FIELDS}
+    return record
+
+
+class Throughput:
+    """Counts documents and source tokens and reports rates."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.docs = 0
+        self.tokens = 0
+        self.errors = 0
+
+    def add(self, record):
+        self.docs += 1
+        self.tokens += record['tokens']
+        if 'error' in record:
+            self.errors += 1
+
+    def report(self, done=False):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'docs': self.docs,
+            'errors': self.errors,
+            'tokens': self.tokens,
+            'seconds': round(elapsed, 3),
+            'docs_per_s': round(self.docs / elapsed, 2) if elapsed else 0.0,
+            'tokens_per_s': round(self.tokens / elapsed, 1) if elapsed else 0.0,
+            'done': done,
+        }
+
+
+def _process_serial(pipeline, documents, intensity, humanize, seed, tokenizer):
+    for key, text in documents:
+        try:
+            result = pipeline.process_document(text, intensity, humanize, seed, tokenizer)
+        except Exception as e:
+            result = e
+        yield key, result
+
+
+def run_batch(documents, out, intensity=0.6, humanize=True, seed=None, workers=1,
+              skip=frozenset(), progress_every=100, log=sys.stderr, tokenizer=None):
+    """
+    Process documents and write one JSON record per document to out.
+
+    Args:
+        documents: Iterable of (id, text) pairs; a text that is an
+            exception is written as an error record without processing
+        out: Writable text stream for the JSONL records
+        intensity: Strength of paraphrasing/humanization (0.0 to 1.0)
+        humanize: Apply AI-detection avoidance
+        seed: Seed for reproducible output (None for fresh randomness)
+        workers: Worker processes (1 runs in this process)
+        skip: Ids to leave out (already done)
+        progress_every: Report throughput to log every N documents (0 = only at the end)
+        log: Stream for throughput reports
+        tokenizer: Tokenizer backend name (None for the default)
+
+    Returns:
+        The final throughput report
+    """
+    texts = {}
+    # (id, error) for input lines that could not be read; they are written
+    # out as error records between the processed documents
+    rejected = []
+
+    def pending():
+        for key, text in documents:
+            if key in skip or key in texts:
+                continue
+            if isinstance(text, Exception):
+                rejected.append((key, text))
+                continue
+            texts[key] = text
+            yield key, text
+
+    def write(record):
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+        throughput.add(record)
+        if progress_every and throughput.docs % progress_every == 0:
+            log.write(json.dumps(throughput.report()) + '\n')
+
+    def flush_rejected():
+        while rejected:
+            key, error = rejected.pop(0)
+            write(make_record(key, '', error))
+
+    throughput = Throughput()
+    pool = None
+    if workers > 1:
+        from parallel import EnginePool
+        pool = EnginePool(workers)
+        results = pool.imap_documents(pending(), intensity, humanize, seed, tokenizer)
+    else:
+        pipeline = Pipeline(ParaphraserEngine())
+        pipeline.warm_up()
+        results = _process_serial(pipeline, pending(), intensity, humanize, seed, tokenizer)
+
+    try:
+        for key, result in results:
+            flush_rejected()
+            write(make_record(key, texts.pop(key), result))
+        flush_rejected()
+    finally:
+        if pool is not None:
+            pool.close()
+
+    report = throughput.report(done=True)
+    log.write(json.dumps(report) + '\n')
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paraphrase and humanize documents in bulk")
+    parser.add_argument('inputs', nargs='+',
+                        help="Files, directories, .jsonl files, or - for JSONL on stdin")
+    parser.add_argument('--output', help="JSONL file to write (stdout if omitted)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip documents already in --output and append to it")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes")
+    parser.add_argument('--intensity', type=float, default=0.6)
+    parser.add_argument('--no-humanize', dest='humanize', action='store_false')
+    parser.add_argument('--seed', type=int, help="Seed for reproducible output")
+    parser.add_argument('--tokenizer', choices=list(TOKENIZERS), help="Tokenizer backend (default: nltk)")
+    parser.add_argument('--pattern', default='*.txt', help="Filename pattern inside directories")
+    parser.add_argument('--text-field', default='text', help="JSONL field holding the text")
+    parser.add_argument('--id-field', default='id', help="JSONL field holding the document id")
+    parser.add_argument('--progress-every', type=int, default=100,
+                        help="Report throughput every N documents")
+    args = parser.parse_args(argv)
+
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    skip = completed_ids(args.output) if args.resume else set()
+    documents = iter_documents(args.inputs, args.pattern, args.text_field, args.id_field)
+
+    if args.output:
+        out = open(args.output, 'a' if args.resume else 'w', encoding='utf-8')
+    else:
+        out = sys.stdout
+    try:
+        report = run_batch(documents, out, args.intensity, args.humanize, args.seed,
+                           args.workers, skip, args.progress_every, tokenizer=args.tokenizer)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
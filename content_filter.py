@@ -0,0 +1,254 @@
+"""
+Content Filter Module
+
+Token-level profanity and advanced-word filter. Blocked terms are compiled
+once into a character trie (with better-profanity's look-alike substitutions
+such as "@" for "a" and "1" for "i"), and the filter walks the tokens the
+pipeline already has in one linear pass, reporting every span it changed.
+Tokenizers split look-alike spellings such as "a$$hole" at the symbols, so
+tokens written without a gap between them are matched as one word.
+"""
+
+import importlib.util
+import os
+import re
+import threading
+
+from resources import get_resources
+
+
+CENSOR_REPLACEMENT = '****'
+
+# Same look-alike characters better-profanity accepts for each letter
+CHARS_MAPPING = {
+    'a': ('a', '@', '*', '4'),
+    'i': ('i', '*', 'l', '1'),
+    'o': ('o', '*', '0', '@'),
+    'u': ('u', '*', 'v'),
+    'v': ('v', '*', 'u'),
+    'l': ('l', '1'),
+    'e': ('e', '*', '3'),
+    's': ('s', '$', '5'),
+    't': ('t', '7'),
+}
+
+_END = '\0'
+
+# Characters that may form part of a word in plain-text filtering
+_WORD_RE = re.compile(r"[\w@$*]+")
+
+# Look-alike characters the tokenizers split words at
+LOOKALIKE_SYMBOLS = frozenset('@$*')
+
+
+def _build_alternatives():
+    """Map each text character to the letters it may stand for."""
+    alternatives = {}
+    for letter, variants in CHARS_MAPPING.items():
+        for variant in variants:
+            alternatives.setdefault(variant, set()).add(letter)
+    return {char: tuple(letters | {char}) for char, letters in alternatives.items()}
+
+
+_ALTERNATIVES = _build_alternatives()
+
+
+def load_profanity_wordlist():
+    """
+    Read better-profanity's bundled word list without importing the package
+    (which loads and expands the list at import time). Returns [] if the
+    package is not installed.
+    """
+    spec = importlib.util.find_spec('better_profanity')
+    if spec is None or not spec.origin:
+        return []
+    path = os.path.join(os.path.dirname(spec.origin), 'profanity_wordlist.txt')
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+class ContentFilter:
+    """
+    Multi-pattern matcher for blocked words and phrases over token sequences.
+    """
+
+    def __init__(self, words=None):
+        """
+        Args:
+            words: Blocked words/phrases (defaults to better-profanity's list)
+        """
+        if words is None:
+            words = load_profanity_wordlist()
+        self._root = {}
+        for term in words:
+            parts = term.lower().split()
+            if not parts:
+                continue
+            self._insert(' '.join(parts))
+            if len(parts) > 1:
+                # Also catch the phrase written as one word ("blowjob")
+                self._insert(''.join(parts))
+
+    def _insert(self, term):
+        node = self._root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[_END] = True
+
+    def _advance(self, nodes, word):
+        """Follow every trie path that spells word (allowing look-alikes)."""
+        for char in word:
+            nodes = [child for node in nodes
+                     for letter in _ALTERNATIVES.get(char, (char,))
+                     for child in (node.get(letter),) if child is not None]
+            if not nodes:
+                break
+        return nodes
+
+    def _match_length(self, words, start):
+        """Number of words in the longest blocked term starting at words[start] (0 if none)."""
+        length = 0
+        nodes = [self._root]
+        index = start
+        while nodes and index < len(words):
+            nodes = self._advance(nodes, words[index].lower())
+            if not nodes:
+                break
+            index += 1
+            if any(_END in node for node in nodes):
+                length = index - start
+            nodes = [node[' '] for node in nodes if ' ' in node]
+        return length
+
+    def _words(self, tokens, spans):
+        """
+        Group tokens into words: a run of word-like tokens with no gap between
+        their spans is one word. Returns (word texts, index of each word's
+        first token, plus len(tokens)).
+        """
+        words = []
+        bounds = []
+        for index, token in enumerate(tokens):
+            if (bounds and spans[index - 1][1] == spans[index][0]
+                    and _WORD_RE.fullmatch(token) and _WORD_RE.fullmatch(tokens[index - 1])):
+                words[-1] += token
+            else:
+                words.append(token)
+                bounds.append(index)
+        bounds.append(len(tokens))
+        return words, bounds
+
+    def filter_tokens(self, tokens, source_tokens=None, advanced_words=frozenset(), spans=None):
+        """
+        Censor blocked terms and undo advanced-word replacements in one pass.
+
+        Args:
+            tokens: Current tokens of a sentence
+            source_tokens: Tokens of the same sentence as written in the input;
+                an advanced word that differs from the source token at the same
+                position was introduced by paraphrasing and is reverted
+            advanced_words: Lowercased set of overly complex words
+            spans: Optional (start, end) character span of each token; tokens
+                with no gap between them ("a", "$", "$", "hole") are matched
+                as one word, whose first token becomes the censor mark and
+                the rest empty strings
+
+        Returns:
+            Tuple of (filtered tokens, list of (start, end, reason) token spans
+            that were changed, with reason 'profanity' or 'advanced')
+        """
+        aligned = source_tokens is not None and len(source_tokens) == len(tokens)
+        result = None
+        changes = []
+
+        censored = set()
+        if spans is not None and self._root:
+            words, bounds = self._words(tokens, spans)
+            if len(words) < len(tokens):
+                index = 0
+                while index < len(words):
+                    length = self._match_length(words, index)
+                    if not length:
+                        index += 1
+                        continue
+                    if result is None:
+                        result = list(tokens)
+                    for word in range(index, index + length):
+                        first, last = bounds[word], bounds[word + 1]
+                        result[first:last] = [CENSOR_REPLACEMENT] + [''] * (last - first - 1)
+                    censored.update(range(bounds[index], bounds[index + length]))
+                    changes.append((bounds[index], bounds[index + length], 'profanity'))
+                    index += length
+
+        index = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if index in censored:
+                index += 1
+                continue
+            length = self._match_length(tokens, index) if self._root else 0
+            if length and censored.isdisjoint(range(index, index + length)):
+                if result is None:
+                    result = list(tokens)
+                result[index:index + length] = [CENSOR_REPLACEMENT] * length
+                changes.append((index, index + length, 'profanity'))
+                index += length
+                continue
+
+            if (aligned and token.lower() in advanced_words and
+                    source_tokens[index] != token):
+                # Keep original word since the advanced one came from paraphrasing
+                if result is None:
+                    result = list(tokens)
+                result[index] = source_tokens[index]
+                changes.append((index, index + 1, 'advanced'))
+            index += 1
+
+        changes.sort()
+        return (result if result is not None else tokens), changes
+
+    def filter_text(self, text):
+        """
+        Censor blocked terms in plain text, leaving everything else untouched.
+
+        Returns:
+            Tuple of (filtered text, list of (start, end) character spans that
+            were changed in the input)
+        """
+        if not text or not self._root:
+            return text, []
+
+        matches = list(_WORD_RE.finditer(text))
+        words = [match.group(0) for match in matches]
+        _, changes = self.filter_tokens(words)
+        if not changes:
+            return text, []
+
+        pieces = []
+        spans = []
+        position = 0
+        for start, end, _ in changes:
+            char_start = matches[start].start()
+            char_end = matches[end - 1].end()
+            pieces.append(text[position:char_start])
+            pieces.append(CENSOR_REPLACEMENT)
+            spans.append((char_start, char_end))
+            position = char_end
+        pieces.append(text[position:])
+        return ''.join(pieces), spans
+
+
+_default_filter = None
+_default_filter_lock = threading.Lock()
+
+
+def get_default_filter():
+    """Return the process-wide ContentFilter, compiling it on first use."""
+    global _default_filter
+    if _default_filter is None:
+        with _default_filter_lock:
+            if _default_filter is None:
+                _default_filter = ContentFilter(get_resources().profanity_words())
+    return _default_filter
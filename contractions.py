@@ -0,0 +1,133 @@
+"""
+Contractions Module
+
+Rewrites contractions in a single scan of the text: one precompiled
+alternation matches every entry of the contraction table, and a callback
+decides per match whether to rewrite it. Works in both directions
+(expanding "don't" to "do not", or contracting "do not" to "don't"), and the
+cost does not grow with the size of the table.
+"""
+
+import re
+
+from seeding import make_rng
+
+
+CONTRACTIONS = {
+    "don't": "do not",
+    "doesn't": "does not",
+    "didn't": "did not",
+    "won't": "will not",
+    "wouldn't": "would not",
+    "can't": "cannot",
+    "couldn't": "could not",
+    "shouldn't": "should not",
+    "isn't": "is not",
+    "aren't": "are not",
+    "wasn't": "was not",
+    "weren't": "were not",
+    "haven't": "have not",
+    "hasn't": "has not",
+    "hadn't": "had not",
+    "it's": "it is",
+    "that's": "that is",
+    "what's": "what is",
+    "who's": "who is",
+}
+
+_APOSTROPHES = "['’]"
+
+
+def _contraction_pattern(contraction):
+    """
+    Regex for a contraction. Accepts straight or curly apostrophes, and the
+    Treebank token split ("do n't", "it 's") left behind by token joining.
+    """
+    pattern = re.escape(contraction).replace("'", _APOSTROPHES)
+    for suffix in ("n" + _APOSTROPHES + "t", _APOSTROPHES + "s"):
+        if pattern.endswith(suffix):
+            pattern = pattern[:-len(suffix)] + r"\s?" + suffix
+    return pattern
+
+
+def _expanded_pattern(expanded):
+    return r"\s+".join(re.escape(word) for word in expanded.split())
+
+
+def _match_case(replacement, original):
+    """Carry the capitalisation of the matched text over to its replacement."""
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[0].isupper():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+def _build_matcher(patterns):
+    # Longest alternatives first so a prefix never shadows a longer entry
+    alternation = '|'.join(sorted(patterns, key=len, reverse=True))
+    return re.compile(r"\b(?:" + alternation + r")\b", re.IGNORECASE)
+
+
+class ContractionRewriter:
+    """
+    Single-pass contraction expander/contractor for a contraction table.
+    """
+
+    def __init__(self, table=None):
+        """
+        Args:
+            table: Dict mapping contractions to their expanded forms
+                (defaults to CONTRACTIONS)
+        """
+        table = table or CONTRACTIONS
+        self._expansions = {c.lower(): e for c, e in table.items()}
+        self._contractions = {' '.join(e.lower().split()): c for c, e in table.items()}
+        self._expand_re = _build_matcher(_contraction_pattern(c) for c in table)
+        self._contract_re = _build_matcher(_expanded_pattern(e) for e in table.values())
+
+    def expand(self, text, probability=1.0, rng=None):
+        """
+        Expand contractions ("don't" -> "do not").
+
+        Args:
+            text: Text to rewrite
+            probability: Chance that each matched contraction is expanded
+            rng: random.Random to draw from
+
+        Returns:
+            Rewritten text
+        """
+        rng = make_rng(rng=rng)
+
+        def replace(match):
+            found = match.group(0)
+            if rng.random() >= probability:
+                return found
+            key = re.sub(r"\s", "", found.lower().replace("’", "'"))
+            return _match_case(self._expansions[key], found)
+
+        return self._expand_re.sub(replace, text)
+
+    def contract(self, text, probability=1.0, rng=None):
+        """
+        Introduce contractions ("do not" -> "don't").
+
+        Args:
+            text: Text to rewrite
+            probability: Chance that each matched phrase is contracted
+            rng: random.Random to draw from
+
+        Returns:
+            Rewritten text
+        """
+        rng = make_rng(rng=rng)
+
+        def replace(match):
+            found = match.group(0)
+            if rng.random() >= probability:
+                return found
+            key = ' '.join(found.lower().split())
+            return _match_case(self._contractions[key], found)
+
+        return self._contract_re.sub(replace, text)
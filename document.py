@@ -0,0 +1,489 @@
+"""
+Annotated Document Module
+
+Splits a document into paragraphs, sentences and tokens once, tags it once,
+and keeps those annotations (with character spans into the source text) so
+that every stage of the pipeline can read and update the same object instead
+of re-tokenizing raw strings.
+
+The input annotation is stored compactly, since documents can run to
+several megabytes: one list of interned tokens for the whole document, POS
+tags as small integer codes and token spans and sentence boundaries in
+array buffers. Sentences only keep their own text, tokens and tags once a
+stage rewrites them.
+"""
+
+import sys
+import threading
+from array import array
+
+import metrics
+from resources import get_resources
+from tokenization import get_tokenizer
+
+
+# POS tag <-> small integer code, shared by every document in the process
+_TAG_NAMES = []
+_TAG_CODES = {}
+_tag_lock = threading.Lock()
+
+class _Source:
+    """Marks a sentence's text, tokens or tags as unchanged from the input."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Unpickles as the module's single instance, so `is _SOURCE` holds
+        # for documents sent to worker processes
+        return '_SOURCE'
+
+
+_SOURCE = _Source()
+
+# Sentences passed to the tagger per call
+TAG_BATCH_SIZE = 2048
+
+
+def tag_code(tag):
+    """Return the integer code of a POS tag, assigning one on first use."""
+    code = _TAG_CODES.get(tag)
+    if code is None:
+        with _tag_lock:
+            code = _TAG_CODES.get(tag)
+            if code is None:
+                code = len(_TAG_NAMES)
+                _TAG_NAMES.append(tag)
+                _TAG_CODES[tag] = code
+    return code
+
+
+def get_default_tagger():
+    """
+    Return the process-wide PerceptronTagger, loading it on first use.
+
+    Depending on the NLTK version, nltk.pos_tag may build a new tagger on
+    every call; sharing one loaded instance avoids that.
+    """
+    return get_resources().tagger()
+
+
+def annotate_documents(docs, tagger=None):
+    """
+    Tokenize and tag the stale sentences of several documents with batched
+    tagger calls of up to TAG_BATCH_SIZE sentences each, so very large
+    inputs never hold the tagger's output for every sentence at once.
+
+    Args:
+        docs: AnnotatedDocument instances
+        tagger: Tagger with a tag_sents() method (defaults to the shared one)
+
+    Returns:
+        The list of documents
+    """
+    docs = list(docs)
+    pending = []
+    with metrics.stage('tokenize'):
+        for doc in docs:
+            pending.extend(doc._pending_tagging())
+
+    for first in range(0, len(pending), TAG_BATCH_SIZE):
+        chunk = [(sentence, is_source, sentence.source_tokens if is_source else sentence.tokens)
+                 for sentence, is_source in pending[first:first + TAG_BATCH_SIZE]]
+        batch = [tokens for _, _, tokens in chunk if tokens]
+        if batch:
+            metrics.count('tagged_sentences', len(batch))
+            with metrics.stage('tagging'):
+                tagged = iter((tagger or get_default_tagger()).tag_sents(batch))
+        for sentence, is_source, tokens in chunk:
+            tags = [tag for _, tag in next(tagged)] if tokens else []
+            if is_source:
+                sentence.source_tags = tags
+            else:
+                sentence.tags = tags
+
+    for doc in docs:
+        for sentence in doc.sentences():
+            if sentence._tags is None:
+                # Tokens match the input, so the input's tags apply
+                sentence._tags = _SOURCE
+    return docs
+
+
+def split_paragraphs(text, line_fallback=True):
+    """
+    Split text into paragraphs, returning (start, end) spans of the stripped
+    paragraph text.
+
+    Paragraphs are separated by blank lines. With line_fallback, text that has
+    no blank lines is split on single newlines instead.
+    """
+    separator = '\n\n'
+    parts = text.split(separator)
+    if len(parts) == 1 and line_fallback:
+        separator = '\n'
+        parts = text.split(separator)
+
+    spans = []
+    position = 0
+    for part in parts:
+        stripped = part.strip()
+        start = position + (len(part) - len(part.lstrip()))
+        spans.append((start, start + len(stripped)))
+        position += len(part) + len(separator)
+    return spans
+
+
+class TokenStore:
+    """
+    The input annotation of a document in compact form, shared by the
+    document and all of its copies.
+
+    Attributes:
+        text: The input text
+        tokens: Interned tokens of every sentence, in order
+        starts, ends: Character span of each token
+        tags: POS tag code of each token (see tag_code)
+        offsets: Index of each sentence's first token, plus the total count
+        sentence_starts, sentence_ends: Character span of each sentence
+        tagged: 1 for every sentence whose tags have been filled in
+    """
+
+    __slots__ = ('text', 'tokens', 'starts', 'ends', 'tags', 'offsets',
+                 'sentence_starts', 'sentence_ends', 'tagged')
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        self.starts = array('i')
+        self.ends = array('i')
+        self.tags = array('H')
+        self.offsets = array('i', [0])
+        self.sentence_starts = array('i')
+        self.sentence_ends = array('i')
+        self.tagged = bytearray()
+
+    def add_sentence(self, start, end, tokens, spans):
+        """Append a sentence and return its index."""
+        intern = sys.intern
+        self.tokens.extend(intern(token) for token in tokens)
+        for token_start, token_end in spans:
+            self.starts.append(token_start)
+            self.ends.append(token_end)
+        self.tags.frombytes(bytes(self.tags.itemsize * len(tokens)))
+        self.offsets.append(len(self.tokens))
+        self.sentence_starts.append(start)
+        self.sentence_ends.append(end)
+        self.tagged.append(0)
+        return len(self.sentence_starts) - 1
+
+    def set_tags(self, index, tags):
+        first, last = self.offsets[index], self.offsets[index + 1]
+        self.tags[first:last] = array('H', [tag_code(tag) for tag in tags])
+        self.tagged[index] = 1
+
+    def get_tags(self, index):
+        if not self.tagged[index]:
+            return None
+        names = _TAG_NAMES
+        return [names[code] for code in self.tags[self.offsets[index]:self.offsets[index + 1]]]
+
+
+class Sentence:
+    """
+    One sentence of an annotated document.
+
+    The ``source_*`` attributes, ``spans``, ``start`` and ``end`` describe
+    the sentence as it appeared in the input and never change; they are read
+    from the document's TokenStore. ``text``, ``tokens`` and ``tags``
+    describe its current state. A stage that rewrites the text without
+    supplying tokens leaves the annotation stale; it is rebuilt on the next
+    call to AnnotatedDocument.annotate().
+
+    As long as every change has been a one-for-one token replacement (see
+    replace_tokens), the current text is the source text with the changed
+    tokens spliced in, so untouched whitespace and punctuation survive
+    exactly.
+    """
+
+    __slots__ = ('store', 'index', '_text', '_tokens', '_tags', '_aligned')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self._text = _SOURCE
+        self._tokens = _SOURCE
+        self._tags = None
+        self._aligned = True
+
+    @property
+    def start(self):
+        return self.store.sentence_starts[self.index]
+
+    @property
+    def end(self):
+        return self.store.sentence_ends[self.index]
+
+    @property
+    def source_tokens(self):
+        store = self.store
+        return store.tokens[store.offsets[self.index]:store.offsets[self.index + 1]]
+
+    @property
+    def source_tags(self):
+        return self.store.get_tags(self.index)
+
+    @source_tags.setter
+    def source_tags(self, tags):
+        self.store.set_tags(self.index, tags)
+
+    @property
+    def spans(self):
+        store = self.store
+        first, last = store.offsets[self.index], store.offsets[self.index + 1]
+        return list(zip(store.starts[first:last], store.ends[first:last]))
+
+    @property
+    def text(self):
+        if self._text is _SOURCE:
+            return self.store.text[self.start:self.end]
+        return self._text
+
+    @property
+    def tokens(self):
+        return self.source_tokens if self._tokens is _SOURCE else self._tokens
+
+    @tokens.setter
+    def tokens(self, tokens):
+        self._tokens = tokens
+
+    @property
+    def tags(self):
+        return self.source_tags if self._tags is _SOURCE else self._tags
+
+    @tags.setter
+    def tags(self, tags):
+        self._tags = tags
+
+    @property
+    def is_stale(self):
+        """True when tokens or tags no longer describe the current text."""
+        return self._tokens is None or self._tags is None
+
+    def update(self, text, tokens=None, tags=None):
+        """
+        Replace the current text of the sentence.
+
+        Args:
+            text: New sentence text (empty removes the sentence from output)
+            tokens: Tokens of the new text, if the caller already has them
+            tags: POS tags matching tokens, if known
+        """
+        self._text = text
+        if not text:
+            tokens, tags = [], []
+        self._tokens = tokens
+        self._tags = tags if tokens is not None else None
+        self._aligned = False
+
+    def splice(self, tokens):
+        """
+        Build the text for tokens that replace the source tokens one for one,
+        copying the source text between the tokens that differ.
+
+        Returns:
+            The new text, or None when the sentence no longer lines up with
+            its source (or a changed token has no span in the source text)
+        """
+        store = self.store
+        first, last = store.offsets[self.index], store.offsets[self.index + 1]
+        if not self._aligned or len(tokens) != last - first:
+            return None
+
+        text = store.text
+        source = store.tokens
+        pieces = []
+        cursor = self.start
+        for position, token in enumerate(tokens, first):
+            if token == source[position]:
+                continue
+            start = store.starts[position]
+            end = store.ends[position]
+            if start == end:
+                return None
+            pieces.append(text[cursor:start])
+            pieces.append(token)
+            cursor = end
+        if not pieces:
+            return text[self.start:self.end]
+        pieces.append(text[cursor:self.end])
+        return ''.join(pieces)
+
+    def replace_tokens(self, tokens, tags, join):
+        """
+        Replace the sentence's tokens one for one (e.g. with synonyms).
+
+        The new text is spliced into the source text when the sentence still
+        lines up with it, and built with join(tokens) otherwise.
+
+        Args:
+            tokens: New tokens, one per current token
+            tags: POS tags for tokens
+            join: Function building text from tokens, used as the fallback
+        """
+        text = self.splice(tokens)
+        if text is None:
+            self.update(join(tokens), tokens, tags)
+        else:
+            self.update(text, tokens, tags)
+            self._aligned = True
+
+    def copy(self):
+        """Independent copy; the immutable source annotation is shared."""
+        clone = Sentence.__new__(Sentence)
+        clone.store = self.store
+        clone.index = self.index
+        clone._text = self._text
+        clone._tokens = list(self._tokens) if isinstance(self._tokens, list) else self._tokens
+        clone._tags = list(self._tags) if isinstance(self._tags, list) else self._tags
+        clone._aligned = self._aligned
+        return clone
+
+
+class Paragraph:
+    """A paragraph of an annotated document and its sentences."""
+
+    __slots__ = ('start', 'end', 'sentences')
+
+    def __init__(self, start, end, sentences):
+        self.start = start
+        self.end = end
+        self.sentences = sentences
+
+    def live_sentences(self):
+        """Sentences that still have text (merged-away sentences are empty)."""
+        return [sentence for sentence in self.sentences if sentence.text]
+
+    def render(self):
+        """
+        Join the live sentences, keeping the original whitespace between
+        neighbours that were both kept and a single space elsewhere.
+        """
+        pieces = []
+        previous = None
+        for sentence in self.sentences:
+            text = sentence.text
+            if not text:
+                continue
+            if previous is not None:
+                if previous.index + 1 == sentence.index and previous.store is sentence.store:
+                    pieces.append(sentence.store.text[previous.end:sentence.start] or ' ')
+                else:
+                    pieces.append(' ')
+            pieces.append(text)
+            previous = sentence
+        return ''.join(pieces)
+
+
+class AnnotatedDocument:
+    """
+    A document split into paragraphs, sentences and tokens, with POS tags and
+    character spans into the original text.
+
+    Build it once per request, pass it through paraphrase, humanize and
+    validate, then call render() for the final text.
+    """
+
+    def __init__(self, text, line_fallback=True, tokenizer=None):
+        """
+        Args:
+            text: Input text
+            line_fallback: Split on single newlines when the text has no
+                blank-line paragraph breaks (the paraphraser's behaviour)
+            tokenizer: Tokenizer backend or its name (see tokenization);
+                also used when stale sentences are re-tokenized
+        """
+        self.text = text
+        self.tokenizer = get_tokenizer(tokenizer)
+        self.store = TokenStore(text)
+        self.paragraphs = []
+
+        if not text or not text.strip():
+            return
+
+        tokenizer = self.tokenizer
+        with metrics.stage('segment'):
+            for para_start, para_end in split_paragraphs(text, line_fallback):
+                sentences = []
+                paragraph_text = text[para_start:para_end]
+                for sent_start, sent_end in tokenizer.sentence_spans(paragraph_text):
+                    start = para_start + sent_start
+                    end = para_start + sent_end
+                    tokens, spans = tokenizer.tokenize_spans(text[start:end], start)
+                    index = self.store.add_sentence(start, end, tokens, spans)
+                    sentences.append(Sentence(self.store, index))
+                self.paragraphs.append(Paragraph(para_start, para_end, sentences))
+
+    @property
+    def is_blank(self):
+        return not self.paragraphs
+
+    def sentences(self):
+        """Iterate over every sentence of the document, in order."""
+        for paragraph in self.paragraphs:
+            for sentence in paragraph.sentences:
+                yield sentence
+
+    def _pending_tagging(self):
+        """Re-tokenize stale sentences and list (sentence, is_source) pairs still needing tags."""
+        pending = []
+        for sentence in self.sentences():
+            if sentence._tokens is None:
+                tokens = self.tokenizer.tokenize(sentence.text)
+                # Rewrites that come back to the input share its annotation
+                sentence._tokens = _SOURCE if tokens == sentence.source_tokens else tokens
+            if not self.store.tagged[sentence.index]:
+                pending.append((sentence, True))
+            if sentence._tags is None and sentence._tokens is not _SOURCE:
+                pending.append((sentence, False))
+        return pending
+
+    def annotate(self, tagger=None):
+        """
+        Tokenize and tag every sentence whose annotation is missing or stale,
+        in one batched tagger call. Sentences whose tokens still match the
+        source reuse the source tags.
+
+        Args:
+            tagger: Tagger with a tag_sents() method (defaults to the shared one)
+        """
+        annotate_documents([self], tagger)
+        return self
+
+    def source_word_count(self):
+        return len(self.text.split())
+
+    def copy(self):
+        """
+        Copy the document so it can be rewritten independently, e.g. to
+        generate several candidates from one annotated input without
+        segmenting and tagging it again.
+        """
+        clone = AnnotatedDocument.__new__(AnnotatedDocument)
+        clone.text = self.text
+        clone.tokenizer = self.tokenizer
+        clone.store = self.store
+        clone.paragraphs = [
+            Paragraph(paragraph.start, paragraph.end,
+                      [sentence.copy() for sentence in paragraph.sentences])
+            for paragraph in self.paragraphs
+        ]
+        return clone
+
+    def sentence_count(self):
+        return len(self.store.sentence_starts)
+
+    def render(self):
+        """Rebuild the document text from the current sentence texts."""
+        if self.is_blank:
+            return self.text
+        return '\n\n'.join(paragraph.render() for paragraph in self.paragraphs)
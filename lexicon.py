@@ -0,0 +1,280 @@
+"""
+Synonym Lexicon Module
+
+Precompiles the filtered, ranked synonym candidates for every (word, POS)
+pair into a compact on-disk hash index, and loads that index with mmap so
+the paraphraser can look candidates up in O(1) without loading WordNet.
+
+Build the index once (requires the NLTK WordNet corpus):
+
+    python lexicon.py build --output synonyms.idx
+
+Index layout (little-endian):
+    header   magic, format version, slot count, entry count, content digest
+    slots    n_slots x (64-bit key hash, 32-bit record offset), open addressing
+    records  key length + key bytes, candidate count, (length + bytes) per candidate
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+
+MAGIC = b'PHLX'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHII16s')
+_SLOT = struct.Struct('<QI')
+
+# Candidates stored per key. More than the engine uses, so words added to the
+# blocklists after the build can be dropped without losing every alternative.
+MAX_STORED_CANDIDATES = 8
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'synonyms.idx')
+
+# WordNet POS codes ('n', 'v', 'a', 'r') that the index is keyed on
+WORDNET_POS = ('n', 'v', 'a', 'r')
+
+
+def _key(word, wordnet_pos):
+    return f"{word.lower()}\t{wordnet_pos}".encode('utf-8')
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+class SynonymLexicon:
+    """
+    Read-only, memory-mapped synonym index produced by build_lexicon().
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Path to an index file written by build_lexicon()
+
+        Raises:
+            ValueError: If the file is not a lexicon index of a known version
+        """
+        self.path = path
+        with open(path, 'rb') as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, n_slots, n_entries, digest = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._data.close()
+            raise ValueError(f"{path} is not a synonym lexicon (format {FORMAT_VERSION})")
+
+        self._n_slots = n_slots
+        self._mask = n_slots - 1
+        self.entry_count = n_entries
+        self.version = digest.hex()
+
+    @classmethod
+    def load_default(cls):
+        """
+        Load the index named by $PARAPHRASER_LEXICON, or synonyms.idx next to
+        this module. Returns None when no index has been built.
+        """
+        path = os.environ.get('PARAPHRASER_LEXICON', DEFAULT_PATH)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def lookup(self, word, wordnet_pos):
+        """
+        Return the ranked synonym candidates for a word, or [] if none.
+
+        Args:
+            word: Surface form as it appears in the text
+            wordnet_pos: WordNet POS code ('n', 'v', 'a' or 'r')
+        """
+        key = _key(word, wordnet_pos)
+        key_hash = _hash(key)
+        slot = key_hash & self._mask
+        data = self._data
+
+        for _ in range(self._n_slots):
+            stored_hash, offset = _SLOT.unpack_from(data, _HEADER.size + slot * _SLOT.size)
+            if offset == 0:
+                return []
+            if stored_hash == key_hash:
+                key_length = int.from_bytes(data[offset:offset + 2], 'little')
+                position = offset + 2
+                if data[position:position + key_length] == key:
+                    return self._read_candidates(position + key_length)
+            slot = (slot + 1) & self._mask
+        return []
+
+    def _read_candidates(self, position):
+        data = self._data
+        count = data[position]
+        position += 1
+        candidates = []
+        for _ in range(count):
+            length = data[position]
+            candidates.append(data[position + 1:position + 1 + length].decode('utf-8'))
+            position += 1 + length
+        return candidates
+
+    def close(self):
+        self._data.close()
+
+
+def write_lexicon(entries, path):
+    """
+    Write an index file.
+
+    Args:
+        entries: Dict mapping (word, wordnet_pos) to a ranked list of candidates
+        path: Output file path
+
+    Returns:
+        Hex digest identifying the index contents
+    """
+    entries = {(word.lower(), pos): candidates
+               for (word, pos), candidates in entries.items() if candidates}
+
+    # Load factor <= 0.5 keeps probe sequences short
+    n_slots = 1
+    while n_slots < max(2 * len(entries), 2):
+        n_slots *= 2
+
+    records = bytearray()
+    slots = [(0, 0)] * n_slots
+    data_offset = _HEADER.size + n_slots * _SLOT.size
+    digest = hashlib.blake2b(digest_size=16)
+
+    for (word, pos) in sorted(entries):
+        key = _key(word, pos)
+        encoded = [c.encode('utf-8') for c in entries[(word, pos)][:MAX_STORED_CANDIDATES]]
+        record = bytearray(len(key).to_bytes(2, 'little') + key + bytes([len(encoded)]))
+        for candidate in encoded:
+            record += bytes([len(candidate)]) + candidate
+        digest.update(record)
+
+        key_hash = _hash(key)
+        slot = key_hash & (n_slots - 1)
+        while slots[slot][1] != 0:
+            slot = (slot + 1) & (n_slots - 1)
+        slots[slot] = (key_hash, data_offset + len(records))
+        records += record
+
+    with open(path, 'wb') as handle:
+        handle.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, n_slots, len(entries), digest.digest()))
+        for key_hash, offset in slots:
+            handle.write(_SLOT.pack(key_hash, offset))
+        handle.write(records)
+
+    return digest.hexdigest()
+
+
+def _inflections(lemma, wordnet_pos):
+    """Regular inflected forms of a lemma that WordNet's morphy can map back."""
+    forms = []
+    if wordnet_pos == 'n':
+        forms = [lemma + 's', lemma + 'es']
+        if lemma.endswith('y'):
+            forms.append(lemma[:-1] + 'ies')
+    elif wordnet_pos == 'v':
+        forms = [lemma + 's', lemma + 'es', lemma + 'ed', lemma + 'd', lemma + 'ing']
+        if lemma.endswith('e'):
+            forms.append(lemma[:-1] + 'ing')
+        if lemma.endswith('y'):
+            forms += [lemma[:-1] + 'ies', lemma[:-1] + 'ied']
+        if len(lemma) > 2 and lemma[-1] not in 'aeiouwxy' and lemma[-2] in 'aeiou':
+            forms += [lemma + lemma[-1] + 'ed', lemma + lemma[-1] + 'ing']
+    elif wordnet_pos == 'a':
+        forms = [lemma + 'er', lemma + 'est', lemma + 'r', lemma + 'st']
+        if lemma.endswith('y'):
+            forms += [lemma[:-1] + 'ier', lemma[:-1] + 'iest']
+    return forms
+
+
+def surface_forms(wordnet_pos, vocabulary=()):
+    """
+    Enumerate the word forms to precompute for one POS: every single-word
+    WordNet lemma, its regular inflections and irregular exception forms,
+    plus any extra vocabulary.
+    """
+    from resources import get_resources
+    wordnet = get_resources().wordnet()
+
+    forms = set()
+    for lemma in wordnet.all_lemma_names(pos=wordnet_pos):
+        if not lemma.isalpha():
+            continue
+        forms.add(lemma)
+        for form in _inflections(lemma, wordnet_pos):
+            if wordnet.morphy(form, wordnet_pos):
+                forms.add(form)
+
+    exceptions = getattr(wordnet, '_exception_map', {}).get(wordnet_pos, {})
+    forms.update(form for form in exceptions if form.isalpha())
+    forms.update(word.lower() for word in vocabulary if word.isalpha())
+    return sorted(forms)
+
+
+def build_lexicon(path=DEFAULT_PATH, vocabulary=(), engine=None):
+    """
+    Precompute synonym candidates for every (word, POS) pair and write the index.
+
+    Args:
+        path: Output file path
+        vocabulary: Extra words to include (e.g. domain terms)
+        engine: ParaphraserEngine whose filters are applied (created if None)
+
+    Returns:
+        Tuple of (entry count, hex digest)
+    """
+    if engine is None:
+        from paraphraser import ParaphraserEngine
+        engine = ParaphraserEngine(lexicon=False)
+
+    entries = {}
+    for wordnet_pos in WORDNET_POS:
+        for word in surface_forms(wordnet_pos, vocabulary):
+            candidates = engine.lookup_wordnet(word, wordnet_pos)
+            if candidates:
+                entries[(word, wordnet_pos)] = candidates
+
+    digest = write_lexicon(entries, path)
+    return len(entries), digest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synonym lexicon tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Precompile the synonym index from WordNet")
+    build.add_argument('--output', default=DEFAULT_PATH, help="Index file to write")
+    build.add_argument('--vocab', action='append', default=[],
+                       help="File of extra words, one per line (repeatable)")
+
+    lookup = commands.add_parser('lookup', help="Look a word up in a built index")
+    lookup.add_argument('word')
+    lookup.add_argument('pos', choices=WORDNET_POS)
+    lookup.add_argument('--index', default=DEFAULT_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        vocabulary = []
+        for vocab_path in args.vocab:
+            with open(vocab_path, encoding='utf-8') as handle:
+                vocabulary.extend(line.strip() for line in handle if line.strip())
+        count, digest = build_lexicon(args.output, vocabulary)
+        print(f"Wrote {count} entries to {args.output} (version {digest})")
+    else:
+        lexicon = SynonymLexicon(args.index)
+        print(', '.join(lexicon.lookup(args.word, args.pos)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
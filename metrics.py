@@ -0,0 +1,266 @@
+"""
+Metrics Module
+
+Per-request timing and counters for the pipeline stages. A request opened
+with request() collects the duration of every stage() block run inside it
+(tokenizing, tagging, WordNet lookups, content filtering, humanizing,
+validation, ...), plus counters such as tokens and sentences and gauges such
+as cache hit rates. When the outermost request finishes, its Trace is handed
+to every registered sink:
+
+    MemorySink       keeps recent traces and running totals (debug panels)
+    LogSink          logs one line per request
+    PrometheusSink   aggregates totals and renders the Prometheus text format
+
+Stages may nest (synonym_lookup runs inside synonyms, and segment/tagging
+inside validation), so stage times of one trace can overlap. Outside a
+request, stage() and count() do nothing, so instrumented code costs next to
+nothing when nobody is listening.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('paraphraser_trace', default=None)
+
+_sinks = []
+_sinks_lock = threading.Lock()
+
+
+class Trace:
+    """
+    Breakdown of one request.
+
+    Attributes:
+        kind: What was requested ('paraphrase', 'humanize', 'improve', 'pipeline', ...)
+        stages: Seconds spent per stage name (summed over repeated stages)
+        calls: Times each stage ran
+        counters: Accumulated counts (tokens, sentences, cache hits, ...)
+        gauges: Last value of each gauge (e.g. cache hit rates)
+        seconds: Wall time of the whole request
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.stages = {}
+        self.calls = {}
+        self.counters = {}
+        self.gauges = {}
+        self.seconds = 0.0
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'seconds': round(self.seconds, 6),
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            'calls': dict(self.calls),
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+        }
+
+
+class _Request:
+    """Context manager behind request()."""
+
+    __slots__ = ('kind', 'trace', '_token', '_start')
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.trace = None
+        self._token = None
+
+    def __enter__(self):
+        outer = _current.get()
+        if outer is not None:
+            # Nested requests (e.g. paraphrase inside the pipeline) add to the outer trace
+            self.trace = outer
+            return outer
+        self.trace = Trace(self.kind)
+        self._token = _current.set(self.trace)
+        self._start = time.perf_counter()
+        return self.trace
+
+    def __exit__(self, *exc_info):
+        if self._token is None:
+            return False
+        self.trace.seconds = time.perf_counter() - self._start
+        _current.reset(self._token)
+        emit(self.trace)
+        return False
+
+
+class _Stage:
+    """Context manager behind stage()."""
+
+    __slots__ = ('name', 'trace', '_start')
+
+    def __init__(self, name):
+        self.name = name
+        self.trace = _current.get()
+
+    def __enter__(self):
+        if self.trace is not None:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.trace is not None:
+            self.trace.add_stage(self.name, time.perf_counter() - self._start)
+        return False
+
+
+def request(kind):
+    """
+    Open a request; use as `with metrics.request('paraphrase') as trace:`.
+    Inside another request, the outer trace is reused.
+    """
+    return _Request(kind)
+
+
+def stage(name):
+    """Time a block as the named stage of the current request."""
+    return _Stage(name)
+
+
+def count(name, value=1):
+    """Add to a counter of the current request."""
+    trace = _current.get()
+    if trace is not None:
+        trace.count(name, value)
+
+
+def gauge(name, value):
+    """Set a gauge of the current request."""
+    trace = _current.get()
+    if trace is not None:
+        trace.gauges[name] = value
+
+
+def current_trace():
+    """The trace of the request in progress, or None."""
+    return _current.get()
+
+
+def add_sink(sink):
+    """Register a sink; it receives every finished Trace via record()."""
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def emit(trace):
+    for sink in list(_sinks):
+        try:
+            sink.record(trace)
+        except Exception:
+            logger.exception("Metrics sink %r failed", sink)
+
+
+class MemorySink:
+    """Keeps the most recent traces and running per-stage totals."""
+
+    def __init__(self, keep=100):
+        self.recent = deque(maxlen=keep)
+        self.totals = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def record(self, trace):
+        with self._lock:
+            self.recent.append(trace)
+            self.requests += 1
+            for name, seconds in trace.stages.items():
+                self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def last(self, kind=None):
+        """The most recent trace (of the given kind), or None."""
+        for trace in reversed(self.recent):
+            if kind is None or trace.kind == kind:
+                return trace
+        return None
+
+
+class LogSink:
+    """Logs each request's breakdown, slowest stage first."""
+
+    def __init__(self, log=None, level=logging.INFO):
+        self.log = log or logger
+        self.level = level
+
+    def record(self, trace):
+        stages = ' '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in
+                          sorted(trace.stages.items(), key=lambda item: item[1], reverse=True))
+        counters = ' '.join(f"{name}={value}" for name, value in sorted(trace.counters.items()))
+        self.log.log(self.level, "%s %.1fms %s %s", trace.kind, trace.seconds * 1000, stages, counters)
+
+
+class PrometheusSink:
+    """
+    Aggregates traces into counters and renders them in the Prometheus text
+    exposition format (serve render() from a /metrics endpoint).
+    """
+
+    def __init__(self, prefix='paraphraser'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._request_seconds = {}
+        self._stage_seconds = {}
+        self._stage_calls = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def record(self, trace):
+        with self._lock:
+            self._requests[trace.kind] = self._requests.get(trace.kind, 0) + 1
+            self._request_seconds[trace.kind] = self._request_seconds.get(trace.kind, 0.0) + trace.seconds
+            for name, seconds in trace.stages.items():
+                self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + seconds
+                self._stage_calls[name] = self._stage_calls.get(name, 0) + trace.calls[name]
+            for name, value in trace.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            self._gauges.update(trace.gauges)
+
+    def render(self):
+        """Return all metrics in the Prometheus text format."""
+        families = [
+            ('requests_total', 'counter', 'Requests processed', 'kind', self._requests),
+            ('request_seconds_total', 'counter', 'Wall time spent in requests', 'kind', self._request_seconds),
+            ('stage_seconds_total', 'counter', 'Time spent per pipeline stage', 'stage', self._stage_seconds),
+            ('stage_calls_total', 'counter', 'Times each pipeline stage ran', 'stage', self._stage_calls),
+            ('events_total', 'counter', 'Tokens, sentences and cache events processed', 'name', self._counters),
+            ('gauge', 'gauge', 'Last reported gauge values (e.g. cache hit rates)', 'name', self._gauges),
+        ]
+        lines = []
+        with self._lock:
+            for suffix, kind, help_text, label, values in families:
+                metric = f"{self.prefix}_{suffix}"
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for name, value in sorted(values.items()):
+                    lines.append(f'{metric}{{{label}="{_escape_label(name)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,196 @@
+"""
+Parallel Processing Module
+
+Spreads the paragraphs of large documents, or whole documents of a batch,
+across a pool of worker processes. Each worker builds its engines once and
+warms them up when the pool starts, so requests only pay for the work itself.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from paraphraser import ParaphraserEngine
+from pipeline import Pipeline
+from resources import get_resources
+from seeding import make_rng
+
+
+# Pipeline owned by each worker process
+_worker_pipeline = None
+
+
+def _init_worker(engine_options, data_paths=()):
+    global _worker_pipeline
+    # Spawned workers start without the parent's extra NLTK data directories
+    for path in data_paths:
+        get_resources().add_data_path(path)
+    # Thread pools run this once per thread; they all share one pipeline
+    if _worker_pipeline is None:
+        pipeline = Pipeline(ParaphraserEngine(**engine_options))
+        pipeline.warm_up()
+        _worker_pipeline = pipeline
+
+
+def _process_paragraph(task):
+    paragraph, intensity, humanize, seed, tokenizer, fused = task
+    return _worker_pipeline.process_paragraph(paragraph, intensity, humanize, seed,
+                                              tokenizer=tokenizer, fused=fused)
+
+
+def _process_document(task):
+    text, intensity, humanize, seed, tokenizer = task
+    return _worker_pipeline.process_document(text, intensity, humanize, seed, tokenizer)
+
+
+def _paraphrase(text, intensity, seed, tokenizer=None):
+    return _worker_pipeline.engine.paraphrase(text, intensity, rng=make_rng(seed), tokenizer=tokenizer)
+
+
+def _humanize(text, intensity, seed, tokenizer=None):
+    return _worker_pipeline.avoider.humanize(text, intensity, rng=make_rng(seed), tokenizer=tokenizer)
+
+
+def _validate(original, paraphrased):
+    return _worker_pipeline.validator.calculate_semantic_similarity(original, paraphrased)
+
+
+def _process(text, intensity, humanize, seed, tokenizer=None):
+    return _worker_pipeline.process_document(text, intensity, humanize, seed, tokenizer)
+
+
+def _candidate(source, intensity, humanize, seed, fused=None):
+    return _worker_pipeline.generate_candidate(source, intensity, humanize, seed, fused)
+
+
+# Single-call operations available through EnginePool.submit
+TASKS = {
+    'paraphrase': _paraphrase,
+    'humanize': _humanize,
+    'validate': _validate,
+    'process': _process,
+    'candidate': _candidate,
+}
+
+
+def _run_task(name, args):
+    return TASKS[name](*args)
+
+
+class EnginePool:
+    """
+    Process pool of pre-warmed pipelines.
+
+    Use as a context manager, or call close() when done:
+
+        with EnginePool(workers=4) as pool:
+            result = Pipeline().run(text, seed=7, pool=pool)
+    """
+
+    def __init__(self, workers=None, engine_options=None, processes=True):
+        """
+        Args:
+            workers: Number of processes (defaults to the CPU count)
+            engine_options: Keyword arguments for each worker's ParaphraserEngine
+            processes: Use worker processes; False runs the workers as threads
+                sharing one pipeline in this process (for tests and small
+                deployments)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self._executor = executor_class(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(engine_options or {}, list(get_resources().data_paths)),
+        )
+
+    def map_paragraphs(self, paragraphs, intensity=0.6, humanize=True, seed=None, tokenizer=None,
+                       fused=None):
+        """
+        Process paragraphs in parallel.
+
+        Args:
+            paragraphs: Paragraph texts
+            intensity: Strength of paraphrasing/humanization (0.0 to 1.0)
+            humanize: Apply AI-detection avoidance
+            seed: Request seed; each paragraph derives its own seed from it
+            tokenizer: Tokenizer backend name (defaults to the workers' engines')
+            fused: Humanize in fused mode (None for the workers' default)
+
+        Yields:
+            Finished paragraphs in input order
+        """
+        paragraphs = list(paragraphs)
+        tasks = [(paragraph, intensity, humanize, seed, tokenizer, fused) for paragraph in paragraphs]
+        # Hand out several short paragraphs per task to keep IPC overhead low
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        yield from self._executor.map(_process_paragraph, tasks, chunksize=chunksize)
+
+    def imap_documents(self, documents, intensity=0.6, humanize=True, seed=None, tokenizer=None):
+        """
+        Process whole documents in parallel, keeping a bounded number in
+        flight so arbitrarily long streams of documents can be fed in.
+
+        Args:
+            documents: Iterable of (key, text) pairs
+            intensity: Strength of paraphrasing/humanization (0.0 to 1.0)
+            humanize: Apply AI-detection avoidance
+            seed: Request seed shared by every document
+            tokenizer: Tokenizer backend name (defaults to the workers' engines')
+
+        Yields:
+            (key, (output, validation)) in completion order; if a document
+            failed, the second item is the exception instead
+        """
+        max_pending = self.workers * 2
+        pending = {}
+        documents = iter(documents)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    key, text = next(documents)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = self._executor.submit(_process_document,
+                                               (text, intensity, humanize, seed, tokenizer))
+                pending[future] = key
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                error = future.exception()
+                yield key, (error if error is not None else future.result())
+
+    def submit(self, name, *args):
+        """
+        Run one of TASKS on a worker.
+
+        Args:
+            name: 'paraphrase' (text, intensity, seed), 'humanize' (text,
+                intensity, seed), 'validate' (original, paraphrased) or
+                'process' (text, intensity, humanize, seed) or 'candidate'
+                (pickled annotated paragraph, intensity, humanize, candidate
+                seed, fused)
+
+        Returns:
+            concurrent.futures.Future for the result
+        """
+        if name not in TASKS:
+            raise KeyError(f"Unknown task: {name}")
+        return self._executor.submit(_run_task, name, args)
+
+    def warm_up(self):
+        """Block until every worker has started and loaded its engines."""
+        wait([self._executor.submit(_run_task, 'validate', ('warm', 'warm'))
+              for _ in range(self.workers)])
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,44 +1,43 @@
-import nltk
-from nltk.corpus import wordnet
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.tag import pos_tag
-from nltk.corpus import stopwords
-import random
-import re
+import numpy as np
 
-# Try to import better-profanity for content filtering
-try:
-    from better_profanity import profanity
-    PROFANITY_AVAILABLE = True
-    profanity.load_censor_words()
-except ImportError:
-    PROFANITY_AVAILABLE = False
+import metrics
+from document import AnnotatedDocument, annotate_documents, get_default_tagger, split_paragraphs
+from cache import LRUCache
+from content_filter import LOOKALIKE_SYMBOLS, get_default_filter
+from contractions import ContractionRewriter
+from lexicon import SynonymLexicon
+from policy import get_policy_store
+from resources import get_resources
+from seeding import make_rng, numpy_rng
+from tokenization import align_tokens, get_tokenizer
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
+# Default number of (word, POS) entries kept in the synonym cache
+DEFAULT_SYNONYM_CACHE_SIZE = 20000
 
-try:
-    nltk.data.find('corpora/omw-1.4')
-except LookupError:
-    nltk.download('omw-1.4')
+# Originals whose key terms the validator keeps ready for rescoring
+DEFAULT_ORIGINAL_CACHE_SIZE = 256
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger')
+# Contraction endings the Treebank tokenizer splits off the previous word
+CLITICS = frozenset(["n't", "'s", "'re", "'ve", "'ll", "'d", "'m"])
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Map POS tags to WordNet POS codes (wordnet.NOUN, VERB, ADJ, ADV)
+WORDNET_POS_MAPPING = {
+    'NN': 'n',
+    'NNS': 'n',
+    'VB': 'v',
+    'VBD': 'v',
+    'VBG': 'v',
+    'VBN': 'v',
+    'VBP': 'v',
+    'VBZ': 'v',
+    'JJ': 'a',
+    'JJR': 'a',
+    'JJS': 'a',
+    'RB': 'r',
+    'RBR': 'r',
+    'RBS': 'r',
+}
 
 
 class ParaphraserEngine:
@@ -47,293 +46,330 @@ class ParaphraserEngine:
     and avoid AI detection.
     """
     
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.synonym_cache = {}
-        
-        # Advanced/overly complex words to avoid in output
-        self.advanced_words = {
-            'meliorate', 'elucidate', 'ameliorate', 'perplex', 'concatenate',
-            'obfuscate', 'cogitate', 'perambulate', 'soliloquy', 'ostentatious',
-            'pellucid', 'sesquipedalian', 'synecdoche', 'propitious', 'bucolic',
-            'perfunctory', 'perspicacious', 'vituperative', 'sycophantic', 'ephemeral',
-            'ubiquitous', 'juxtapose', 'dichotomy', 'paradigm', 'epistemological',
-            'ontological', 'phenomenological', 'teleological', 'hermeneutical', 'dialectical'
-        }
+    def __init__(self, tagger=None, lexicon=None, synonym_cache_size=DEFAULT_SYNONYM_CACHE_SIZE,
+                 policy_store=None, tokenizer=None):
+        """
+        Args:
+            tagger: POS tagger to share (defaults to the process-wide one)
+            lexicon: SynonymLexicon to use; None loads the default index if one
+                has been built, False always queries WordNet directly
+            synonym_cache_size: Maximum (word, POS) entries kept in the synonym cache
+            policy_store: PolicyStore for the skip/blocklists (defaults to the
+                process-wide lexical_policy.json)
+            tokenizer: Default tokenizer backend or its name (see tokenization);
+                requests can pick another one
+        """
+        # Keyed on (lowercased word, WordNet POS); LRU-evicted so memory stays
+        # flat on a long-running server
+        self.synonym_cache = LRUCache(synonym_cache_size)
+        if lexicon is None:
+            lexicon = SynonymLexicon.load_default()
+        self.lexicon = lexicon or None
+        # NLTK data and word lists are loaded on first use, not at construction
+        self._tagger = tagger
+        # Skip/blocklists are compiled once per process and shared
+        self.policy_store = policy_store or get_policy_store()
+        self._policy_version = None
+        self.contractions = ContractionRewriter()
+        self.tokenizer = get_tokenizer(tokenizer)
+    
+    @property
+    def tagger(self):
+        """One loaded POS tagger, shared by every document this engine annotates."""
+        if self._tagger is None:
+            self._tagger = get_default_tagger()
+        return self._tagger
+    
+    @property
+    def stop_words(self):
+        return get_resources().stopwords()
+    
+    @property
+    def content_filter(self):
+        """Profanity trie, compiled once per process and shared."""
+        return get_default_filter()
+    
+    @property
+    def policy(self):
+        """
+        The current LexicalPolicy. When the policy file has been edited and
+        reloaded, cached synonyms chosen under the old lists are dropped.
+        """
+        policy = self.policy_store.current()
+        if policy.version != self._policy_version:
+            self.synonym_cache.clear()
+            self._policy_version = policy.version
+        return policy
+    
+    @property
+    def advanced_words(self):
+        """Advanced/overly complex words to avoid in output."""
+        return self.policy.advanced_words
+    
+    @property
+    def data_version(self):
+        """
+        Fingerprint of the data results depend on (lexicon and lexical
+        policy). Changes whenever either is rebuilt or edited, so cached
+        results made with older data are never served.
+        """
+        lexicon_version = self.lexicon.version if self.lexicon is not None else 'wordnet'
+        return f"{lexicon_version}:{self.policy.version}"
     
     def get_synonyms(self, word, pos):
         """Get synonyms for a word based on its part of speech.
         Prefers simpler, more common synonyms."""
-        if word in self.synonym_cache:
-            return self.synonym_cache[word]
-        
-        synonyms = []
+        policy = self.policy
+        wordnet_pos = WORDNET_POS_MAPPING.get(pos)
+        key = (word.lower(), wordnet_pos)
         
-        # Words that produce bad/offensive/archaic replacements - skip them entirely
-        skip_words = {
-            'paradigm', 'methodology', 'instantiate', 'utilize', 'facilitate',
-            'approach', 'method', 'analysis', 'research', 'study', 'inquiry', 'enquiry',
-            'group', 'focus', 'interview', 'observation', 'data', 'result',
-            'understanding', 'knowledge', 'experience', 'perspective', 'outcome',
-            'student', 'teacher', 'researcher', 'participant', 'learner',
-            'education', 'learning', 'teaching', 'academic', 'achievement',
-            'context', 'meaning', 'theory', 'concept', 'framework'
-        }
-        
-        # Bad replacement words found in output - never use these
-        bad_replacements = {
-            'meliorate', 'elucidate', 'ameliorate', 'perplex', 'concatenate',
-            'obfuscate', 'cogitate', 'perambulate', 'soliloquy', 'ostentatious',
-            'pellucid', 'sesquipedalian', 'synecdoche', 'propitious', 'bucolic',
-            'wads', 'nidus', 'rankness', 'motley', 'eruditeness', 'amorphous',
-            'kinda', 'finis', 'kinship', 'coarse', 'mount', 'fighting',
-            'reside', 'dwell', 'pedantic', 'ofttimes', 'sooner',
-            'helot', 'serf', 'thrall', 'bondsman', 'racism', 'racist',
-            'slur', 'epithet', 'derogatory', 'offensive', 'bigot',
-            'slave', 'bondage', 'servitude', 'bondwoman', 'bondman',
-            # Bad replacements from 100% intensity test
-            'drill', 'bookman', 'inquire', 'phenomenon', 'feeler', 'decisive',
-            'stress', 'version', 'dispute', 'exit', 'realism', 'find', 'canvas',
-            'surmise', 'numeric', 'bod', 'sight', 'try', 'amend', 'run', 'omen',
-            'pawn', 'rout', 'immanent', 'call', 'import', 'soul', 'conduct',
-            'vulgar', 'admit', 'audience', 'radical', 'schoolroom', 'notice',
-            'comprehend', 'adjust', 'fullness', 'player', 'forte', 'sensibility',
-            'conflict', 'access', 'head', 'aim', 'seeking', 'exam', 'measure',
-            'deal', 'search', 'process', 'get', 'live', 'adopt', 'inducive',
-            'see', 'form', 'operation', 'schoolroom', 'muse', 'epistemic',
-            'hire', 'database', 'appears', 'proficiency', 'fixation', 'let',
-            'name', 'infer', 'bank', 'take', 'dynamic', 'use', 'read', 'sentience',
-            'condition', 'rigor', 'eubstance', 'value', 'still', 'issue',
-            'accent', 'rigour', 'elaborate', 'bill', 'raise', 'cogency', 'work',
-            'primal', 'fix', 'timber', 'brainwave', 'line', 'ask', 'inert',
-            'debar', 'alive', 'reading', 'summons', 'entire', 'societal', 'world',
-            'model', 'science', 'free', 'term', 'intent', 'finding', 'hold',
-            'conclusion', 'illation', 'tender', 'deem', 'eminence', 'possibly',
-            'full', 'argument', 'rest', 'vantage', 'limitation', 'preciseness',
-            'trend', 'treatment', 'program', 'still', 'nicety', 'case', 'gobs',
-            'sealed', 'otherwise', 'ply', 'consequently', 'field', 'scholar',
-            'sight', 'reply', 'know', 'last', 'complexness', 'mensurable',
-            'educator', 'adopt', 'variety', 'act',
-            # Additional bad replacements from second output
-            'event', 'attack', 'praxis', 'image', 'upshot', 'premise', 'premiss',
-            'remainder', 'speak', 'topic', 'prime', 'rationalist', 'note', 'assess',
-            'canvass', 'expend', 'lesson', 'resume', 'trial', 'settle', 'quite',
-            'realise', 'grouping', 'doings', 'notion', 'watching', 'instructor',
-            'profusion', 'paw', 'query', 'outgrowth', 'trace', 'sizing', 'educatee',
-            'lowly', 'target', 'shine', 'preeminence', 'tool', 'technique',
-            'numerical', 'tie', 'key', 'rule', 'drift', 'need', 'shape', 'office',
-            'substance', 'hit', 'cognizance', 'retainer', 'coming', 'similar',
-            'apply', 'trustiness', 'root', 'phallus', 'deep', 'report', 'set',
-            'essay', 'appeal', 'view', 'intact', 'metier', 'lector', 'residue',
-            'reward', 'care', 'charm', 'shade', 'lots', 'elaborated', 'bit',
-            'mogul', 'want', 'flux', 'formalize', 'valuate', 'expiation',
-            'substantive', 'revalue', 'bosom', 'ism',
-            # Additional non-academic words to avoid
-            'vogue', 'vulgarize', 'assemblage', 'cat\'s-paw', 'rede', 'germ', 'swan',
-            'derogate', 'appendage', 'racy', 'wee', 'overture', 'limpidity', 'palm',
-            'shew', 'sure', 'aroused', 'king', 'lotion', 'rack', 'rife', 'dissent',
-            'rivet', 'notably', 'universe', 'sketch', 'rootle', 'augur', 'mortal',
-            'breadth', 'mutual', 'reflexion',
-            # Additional problematic replacements that don't match original meaning
-            'pattern', 'effect', 'preparation', 'scheme', 'prevailing', 'effrontery',
-            'assembling', 'construe', 'vital', 'emphasise', 'pore', 'worthful', 'departure',
-            'prefer', 'yield', 'kind', 'bear', 'examine', 'better', 'prove', 'position',
-            'compare', 'variable', 'allot', 'belief', 'uncouth', 'observance', 'pupil',
-            'conform', 'motion', 'assay', 'serve', 'mensuration', 'survive', 'come',
-            'year', 'execution', 'differ', 'mull', 'decided', 'evidently', 'integrated',
-            'include', 'regress', 'close', 'sampling', 'demand', 'toy', 'part', 'too',
-            'consistence', 'validness', 'think', 'appraise', 'control', 'origin', 'survey',
-            'liken', 'stay', 'void', 'Still', 'function', 'Nevertheless', 'hear', 'procedure',
-            'fault', 'reality', 'degage', 'design', 'give', 'liberal', 'living', 'width',
-            'vulgarise', 'advance', 'limit', 'plow', 'style', 'evaluate', 'seize', 'forge',
-            'explicate', 'leave', 'tale', 'unveil', 'copy', 'clearly', 'sundry', 'realize',
-            'answer', 'offer', 'amply', 'treat', 'imply', 'resultant', 'pedagog', 'mix',
-            'hug', 'approaching', 'construe', 'assemble', 'depart', 'yield',
-            # Additional archaic and inappropriate words to avoid
-            'villein', 'epitome', 'sire', 'mensurate', 'presage', 'rendering',
-            'surmisal', 'watch', 'ponder', 'hardiness', 'bailiwick', 'withal', 'espouse',
-            'pedagogue'
-        }
+        synonyms = self.synonym_cache.get(key)
+        if synonyms is not None:
+            metrics.count('synonym_cache_hits')
+            return synonyms
         
+        metrics.count('synonym_cache_misses')
+        synonyms = []
         # Skip words that are already fine as-is
-        if word.lower() in skip_words:
-            self.synonym_cache[word] = []
-            return []
-        
-        # Map POS tags to wordnet POS
-        pos_mapping = {
-            'NN': wordnet.NOUN,
-            'NNS': wordnet.NOUN,
-            'VB': wordnet.VERB,
-            'VBD': wordnet.VERB,
-            'VBG': wordnet.VERB,
-            'VBN': wordnet.VERB,
-            'VBP': wordnet.VERB,
-            'VBZ': wordnet.VERB,
-            'JJ': wordnet.ADJ,
-            'JJR': wordnet.ADJ,
-            'JJS': wordnet.ADJ,
-            'RB': wordnet.ADV,
-            'RBR': wordnet.ADV,
-            'RBS': wordnet.ADV,
-        }
+        if wordnet_pos and word.lower() not in policy.skip_words:
+            # Timed separately; runs inside the 'synonyms' stage
+            with metrics.stage('synonym_lookup'):
+                if self.lexicon:
+                    # Precompiled index; re-check the blocklists in case they grew
+                    # after the index was built
+                    synonyms = [synonym for synonym in self.lexicon.lookup(word, wordnet_pos)
+                                if policy.allows(synonym)]
+                else:
+                    synonyms = self.lookup_wordnet(word, wordnet_pos, policy)
         
-        wordnet_pos = pos_mapping.get(pos)
-        
-        if wordnet_pos:
-            for synset in wordnet.synsets(word, pos=wordnet_pos):
-                for lemma in synset.lemmas():
-                    synonym = lemma.name().replace('_', ' ')
-                    # Filter criteria - prefer simpler words
-                    if (synonym.lower() != word.lower() and 
-                        synonym.lower() not in skip_words and
-                        synonym.lower() not in bad_replacements and
-                        len(synonym) <= len(word) + 2 and  # Very similar length - keep it short
-                        len(synonym) < 12 and  # Max 12 chars (plain, simple words)
-                        ' ' not in synonym and  # Single words only
-                        len(synonym) > 2):  # At least 3 chars
-                        synonyms.append(synonym)
-        
-        # Sort by length (prefer shorter = simpler words)
-        synonyms = sorted(list(set(synonyms)), key=len)
         # Limit to 2 best options - only the simplest alternatives
         synonyms = synonyms[:2]
-        self.synonym_cache[word] = synonyms
+        self.synonym_cache.put(key, synonyms)
         return synonyms
     
+    def cache_stats(self):
+        """Return hit/miss/eviction counters for the synonym cache."""
+        return self.synonym_cache.stats()
+    
+    def lookup_wordnet(self, word, wordnet_pos, policy=None):
+        """
+        Query WordNet directly for filtered synonym candidates.
+        
+        Args:
+            word: Word to look up
+            wordnet_pos: WordNet POS code ('n', 'v', 'a' or 'r')
+            policy: LexicalPolicy to filter with (defaults to the current one)
+        
+        Returns:
+            All acceptable candidates, shortest (simplest) first
+        """
+        policy = policy or self.policy
+        wordnet = get_resources().wordnet()
+        synonyms = []
+        for synset in wordnet.synsets(word, pos=wordnet_pos):
+            for lemma in synset.lemmas():
+                synonym = lemma.name().replace('_', ' ')
+                # Filter criteria - prefer simpler words
+                if (synonym.lower() != word.lower() and 
+                    policy.allows(synonym) and
+                    len(synonym) <= len(word) + 2 and  # Very similar length - keep it short
+                    len(synonym) < 12 and  # Max 12 chars (plain, simple words)
+                    ' ' not in synonym and  # Single words only
+                    len(synonym) > 2):  # At least 3 chars
+                    synonyms.append(synonym)
+        
+        # Sort by length (prefer shorter = simpler words); ties keep WordNet order
+        return sorted(dict.fromkeys(synonyms), key=len)
+    
     def join_tokens_properly(self, tokens):
-        """Join tokens while keeping punctuation attached to previous words.
-        Fixes spacing around quotes and apostrophes."""
+        """
+        Join tokens in a single pass, keeping punctuation and clitics ("n't",
+        "'s") attached to the previous word and quotes and brackets next to
+        the words they enclose.
+        
+        A single quote closes an open single quote; otherwise it is a
+        possessive after a word ending in "s" when it cannot be paired with a
+        later one ("the students' day"), and opens a quote everywhere else.
+        
+        Sentences whose tokens still line up with the input are rebuilt by
+        Sentence.replace_tokens from the source text instead; this is the
+        fallback for sentences rewritten by other stages.
+        """
         if not tokens:
             return ""
         
-        result = []
-        punctuation = '.,;:!?)-'
-        quote_marks = '\'"'
-        
-        for i, token in enumerate(tokens):
-            if i == 0:
-                result.append(token)
-            elif token in punctuation or (len(token) > 0 and token[0] in punctuation):
-                # No space before punctuation
-                result[-1] += token
-            elif token in quote_marks or (len(token) > 0 and token[0] in quote_marks):
-                # Handle quotes: attach to previous word if closing, separate if opening
-                if token in ['"', "'"] and i > 0:
-                    # Single quote or double quote - if it's likely closing quote, attach
-                    result[-1] += token
+        punctuation = '.,;:!?)]}-'
+        pieces = []
+        attach = True  # no space before the next token
+        singles = tokens.count("'")  # single quotes not yet placed
+        quoted = False  # a single quote is open
+        previous = ''
+        
+        for token in tokens:
+            if not token:
+                # Removed (e.g. the rest of a censored word)
+                continue
+            if token == '``' or token in ('(', '[', '{'):
+                # Opening quote or bracket: keep the next word next to it
+                glue = attach
+                attach = True
+                token = '"' if token == '``' else token
+            elif token == "'":
+                if not quoted and (singles % 2 == 0 or previous[-1:] not in ('s', 'S')):
+                    # Opening single quote
+                    glue = attach
+                    attach = True
+                    quoted = True
                 else:
-                    result.append(token)
+                    # Closing quote or possessive: attach to the previous word
+                    glue = True
+                    attach = False
+                    quoted = False
+                singles -= 1
+            elif token == "''" or token == '"':
+                # Closing (or ambiguous) quote: attach to the previous word
+                glue = True
+                attach = False
+                token = '"' if token == "''" else token
             else:
-                result.append(token)
+                glue = (attach or token.lower() in CLITICS
+                        or (token[:1] in punctuation and token != '--'))
+                attach = False
+            pieces.append(token if glue else ' ' + token)
+            previous = token
+        
+        return ''.join(pieces)
+    
+    def annotate(self, text, line_fallback=True, tokenizer=None):
+        """
+        Build the annotated document for a request.
+
+        Args:
+            text: Input text
+            line_fallback: Split on single newlines when there are no blank lines
+            tokenizer: Tokenizer backend for this request (defaults to the engine's)
+
+        Returns:
+            AnnotatedDocument with paragraphs, sentences, tokens and tags
+        """
+        return AnnotatedDocument(text, line_fallback, tokenizer or self.tokenizer).annotate(self.tagger)
+    
+    def annotate_many(self, texts, line_fallback=True, tokenizer=None):
+        """
+        Build annotated documents for several texts, tagging all of their
+        sentences in one batched call.
         
-        # Post-process to fix spacing around quotes and apostrophes
-        final_text = ' '.join(result)
-        # Fix space before closing quotes/apostrophes: "word ' " -> "word'"
-        final_text = final_text.replace(" '", "'")
-        final_text = final_text.replace(' "', '"')
-        # Fix space after opening quotes
-        final_text = final_text.replace('" ', '"')
-        final_text = final_text.replace("' ", "'")
+        Args:
+            texts: Input texts
+            line_fallback: Split on single newlines when there are no blank lines
+            tokenizer: Tokenizer backend for this request (defaults to the engine's)
         
-        return final_text
+        Returns:
+            List of AnnotatedDocument, in input order
+        """
+        tokenizer = tokenizer or self.tokenizer
+        docs = [AnnotatedDocument(text, line_fallback, tokenizer) for text in texts]
+        return annotate_documents(docs, self.tagger)
     
-    def replace_with_synonyms(self, text, intensity=0.5):
+    def replace_with_synonyms(self, text, intensity=0.5, rng=None):
         """Replace words with synonyms based on intensity."""
-        sentences = sent_tokenize(text)
-        paraphrased_sentences = []
-        
-        for sentence in sentences:
-            tokens = word_tokenize(sentence)
-            pos_tags = pos_tag(tokens)
-            
-            paraphrased_tokens = []
-            for word, pos in pos_tags:
-                # Skip punctuation and stop words with lower probability
-                if word.lower() in self.stop_words or not word.isalpha() or len(word) < 4:
-                    paraphrased_tokens.append(word)
-                else:
-                    # Increased replacement intensity with quality filters
-                    if random.random() < intensity * 0.7:  # Better replacement rate
-                        synonyms = self.get_synonyms(word, pos)
-                        if synonyms:
-                            replacement = random.choice(synonyms)
-                            paraphrased_tokens.append(replacement)
-                        else:
-                            paraphrased_tokens.append(word)
-                    else:
-                        paraphrased_tokens.append(word)
-            
-            paraphrased_sentences.append(self.join_tokens_properly(paraphrased_tokens))
+        doc = self.annotate(text, line_fallback=False)
+        self.replace_with_synonyms_document(doc, intensity, rng)
+        return doc.render()
+    
+    def replace_with_synonyms_document(self, doc, intensity=0.5, rng=None):
+        """
+        Replace words with synonyms in every sentence of an annotated document.
         
-        return ' '.join(paraphrased_sentences)
+        The random decisions for the whole document are drawn as one NumPy
+        array (a replacement draw and a candidate pick per token), so the
+        Python loop only visits the tokens the draws select.
+        """
+        rng = make_rng(rng=rng)
+        doc.annotate(self.tagger)
+        stop_words = self.stop_words
+        
+        sentences = []
+        token_lists = []
+        tag_lists = []
+        for sentence in doc.sentences():
+            tokens = sentence.tokens
+            if tokens:
+                sentences.append(sentence)
+                token_lists.append(tokens)
+                tag_lists.append(sentence.tags)
+        if not sentences:
+            return doc
+        offsets = np.cumsum([0] + [len(tokens) for tokens in token_lists])
+        draws = numpy_rng(rng).random((2, int(offsets[-1])))
+        
+        # Increased replacement intensity with quality filters
+        selected = np.flatnonzero(draws[0] < intensity * 0.7)  # Better replacement rate
+        owners = np.searchsorted(offsets, selected, side='right') - 1
+        offsets = offsets.tolist()
+        
+        replaced = {}
+        for index, owner, pick in zip(selected.tolist(), owners.tolist(), draws[1, selected].tolist()):
+            position = index - offsets[owner]
+            word = token_lists[owner][position]
+            # Skip punctuation and stop words
+            if len(word) < 4 or not word.isalpha() or word.lower() in stop_words:
+                continue
+            synonyms = self.get_synonyms(word, tag_lists[owner][position])
+            if synonyms:
+                tokens = replaced.get(owner)
+                if tokens is None:
+                    tokens = replaced[owner] = list(token_lists[owner])
+                tokens[position] = synonyms[int(pick * len(synonyms))]
+        
+        for owner, tokens in replaced.items():
+            # Synonyms keep the POS of the word they replace
+            sentences[owner].replace_tokens(tokens, tag_lists[owner], self.join_tokens_properly)
+        
+        return doc
     
     def restructure_sentences(self, text):
         """Restructure sentences to vary sentence patterns."""
-        sentences = sent_tokenize(text)
-        restructured = []
-        
-        for sentence in sentences:
-            # Simple restructuring by moving clauses or adding variations
-            sentence = sentence.strip()
-            if sentence.endswith('.'):
-                sentence = sentence[:-1]
-            
-            # Add variations
-            if random.random() < 0.3 and len(sentence) > 20:
-                # Sometimes restructure by moving subject
-                tokens = word_tokenize(sentence)
-                if len(tokens) > 5:
-                    # Shuffle some middle words (but not the beginning structure too much)
-                    mid_point = len(tokens) // 2
-                    if mid_point > 2:
-                        restructured.append(sentence + '.')
-                    else:
-                        restructured.append(sentence + '.')
-                else:
-                    restructured.append(sentence + '.')
+        doc = AnnotatedDocument(text, line_fallback=False, tokenizer=self.tokenizer)
+        self.restructure_document(doc)
+        return doc.render()
+    
+    def restructure_document(self, doc):
+        """Restructure sentences of an annotated document to vary sentence patterns."""
+        for sentence in doc.sentences():
+            text = sentence.text.strip()
+            if not text or text.endswith('.'):
+                continue
+            # Every sentence ends with a full stop
+            if sentence.is_stale:
+                sentence.update(text + '.')
             else:
-                restructured.append(sentence + '.')
+                sentence.update(text + '.', sentence.tokens + ['.'], sentence.tags + ['.'])
         
-        return ' '.join(restructured)
+        return doc
     
-    def add_variations(self, text):
-        """Add minor grammatical variations."""
-        # Replace common contractions with expanded forms and vice versa
-        contractions = {
-            "don't": "do not",
-            "doesn't": "does not",
-            "didn't": "did not",
-            "won't": "will not",
-            "wouldn't": "would not",
-            "can't": "cannot",
-            "couldn't": "could not",
-            "shouldn't": "should not",
-            "isn't": "is not",
-            "aren't": "are not",
-            "wasn't": "was not",
-            "weren't": "were not",
-            "haven't": "have not",
-            "hasn't": "has not",
-            "hadn't": "had not",
-            "it's": "it is",
-            "that's": "that is",
-            "what's": "what is",
-            "who's": "who is",
-        }
+    def add_variations(self, text, direction='expand', rng=None):
+        """
+        Add minor grammatical variations.
         
-        result = text
-        for contraction, expanded in contractions.items():
-            # Replace contractions with some probability
-            if random.random() < 0.4:
-                result = re.sub(r'\b' + contraction + r'\b', expanded, result, flags=re.IGNORECASE)
+        Args:
+            text: Text to vary
+            direction: 'expand' rewrites contractions into their full forms,
+                'contract' introduces contractions
+            rng: random.Random to draw from
         
-        return result
+        Returns:
+            Text with some contractions rewritten (single pass over the text)
+        """
+        # Replace common contractions with expanded forms and vice versa
+        if direction == 'contract':
+            return self.contractions.contract(text, probability=0.4, rng=rng)
+        return self.contractions.expand(text, probability=0.4, rng=rng)
     
     def filter_content(self, text):
         """
-        Filter output text to remove vulgar/racist content and advanced words.
-        Uses better-profanity if available, plus custom filters.
+        Filter output text to remove vulgar/racist content.
+        Uses better-profanity's word list if available, plus custom filters.
         
         Args:
             text: Text to filter
@@ -344,31 +380,47 @@ class ParaphraserEngine:
         if not text:
             return text
         
-        result = text
-        
-        # Filter using better-profanity if available
-        if PROFANITY_AVAILABLE:
-            result = profanity.censor(result)
-        
-        # Remove advanced academic words that are too complex
-        words = result.split()
-        cleaned_words = []
-        
-        for word in words:
-            # Extract the base word (remove punctuation)
-            base_word = re.sub(r'[^\w\s]', '', word)
-            
-            # Check if word is in advanced_words list
-            if base_word.lower() in self.advanced_words:
-                # Keep original word since it's likely from original text
-                cleaned_words.append(word)
-            else:
-                cleaned_words.append(word)
-        
-        result = ' '.join(cleaned_words)
+        result, _ = self.content_filter.filter_text(text)
         return result
     
-    def paraphrase(self, text, intensity=0.6):
+    def add_variations_document(self, doc, rng=None):
+        """Apply add_variations to each sentence of an annotated document."""
+        rng = make_rng(rng=rng)
+        for sentence in doc.sentences():
+            varied = self.add_variations(sentence.text, rng=rng)
+            if varied != sentence.text:
+                sentence.update(varied)
+        return doc
+    
+    def filter_document(self, doc):
+        """
+        Filter an annotated document for safety in one pass over its tokens.
+        Censors vulgar/racist terms and reverts advanced words that were
+        introduced by synonym replacement back to the original word.
+        
+        Returns:
+            List of (sentence, start, end, reason) token spans that were changed
+        """
+        doc.annotate(self.tagger)
+        advanced_words = self.advanced_words
+        changed = []
+        
+        for sentence in doc.sentences():
+            tokens = sentence.tokens
+            spans = None
+            if not LOOKALIKE_SYMBOLS.isdisjoint(tokens):
+                # "a$$hole" is tokenized as a, $, $, hole; the spans let the
+                # filter match gap-free runs of tokens as one word
+                spans = align_tokens(tokens, sentence.text)
+            tokens, changes = self.content_filter.filter_tokens(
+                tokens, sentence.source_tokens, advanced_words, spans)
+            if changes:
+                sentence.replace_tokens(tokens, sentence.tags, self.join_tokens_properly)
+                changed.extend((sentence, start, end, reason) for start, end, reason in changes)
+        
+        return changed
+    
+    def paraphrase(self, text, intensity=0.6, seed=None, rng=None, tokenizer=None):
         """
         Main paraphrasing method that applies multiple techniques.
         Preserves paragraph structure from input.
@@ -376,6 +428,9 @@ class ParaphraserEngine:
         Args:
             text: Input text to paraphrase
             intensity: Strength of paraphrasing (0.0 to 1.0)
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
+            tokenizer: Tokenizer backend for this request (defaults to the engine's)
         
         Returns:
             Paraphrased text with original paragraph structure preserved
@@ -383,41 +438,78 @@ class ParaphraserEngine:
         if not text or not text.strip():
             return text
         
-        # Split by paragraphs (double newline or single newline)
-        paragraphs = text.split('\n\n')
-        if len(paragraphs) == 1:
-            # Try splitting by single newlines
-            paragraphs = text.split('\n')
+        with metrics.request('paraphrase'):
+            doc = self.annotate(text, tokenizer=tokenizer)
+            metrics.count('sentences', doc.sentence_count())
+            metrics.count('tokens', doc.source_word_count())
+            self.paraphrase_document(doc, intensity, seed, rng)
+            return doc.render()
+    
+    def paraphrase_stream(self, text, intensity=0.6, seed=None, rng=None, tokenizer=None):
+        """
+        Paraphrase text one paragraph at a time, yielding each paragraph as
+        soon as it is done.
         
-        paraphrased_paragraphs = []
+        Args:
+            text: Input text to paraphrase
+            intensity: Strength of paraphrasing (0.0 to 1.0)
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
+            tokenizer: Tokenizer backend for this request (defaults to the engine's)
         
-        # Process each paragraph separately
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                paraphrased_paragraphs.append('')
-                continue
-            
-            # Apply techniques in sequence to each paragraph
-            result = paragraph
-            
-            # Step 1: Replace with synonyms
-            result = self.replace_with_synonyms(result, intensity * 0.7)
-            
-            # Step 2: Add variations
-            result = self.add_variations(result)
-            
-            # Step 3: Restructure
-            if intensity > 0.5:
-                result = self.restructure_sentences(result)
-            
-            # Step 4: Filter content for safety
-            result = self.filter_content(result)
-            
-            paraphrased_paragraphs.append(result)
+        Yields:
+            Paraphrased paragraphs in input order
+        """
+        if not text or not text.strip():
+            return
         
-        # Rejoin paragraphs with double newlines
-        return '\n\n'.join(paraphrased_paragraphs)
+        rng = make_rng(seed, rng)
+        for start, end in split_paragraphs(text):
+            doc = self.annotate(text[start:end], line_fallback=False, tokenizer=tokenizer)
+            self.paraphrase_document(doc, intensity, rng=rng)
+            yield doc.render()
+    
+    def paraphrase_document(self, doc, intensity=0.6, seed=None, rng=None):
+        """
+        Paraphrase an annotated document in place.
+        
+        Args:
+            doc: AnnotatedDocument built by annotate()
+            intensity: Strength of paraphrasing (0.0 to 1.0)
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
+        
+        Returns:
+            The same document, updated
+        """
+        if doc.is_blank:
+            return doc
+        
+        rng = make_rng(seed, rng)
+        
+        # Tag up front so tagging is timed as its own stage
+        doc.annotate(self.tagger)
+        
+        # Step 1: Replace with synonyms
+        with metrics.stage('synonyms'):
+            self.replace_with_synonyms_document(doc, intensity * 0.7, rng)
+        
+        # Step 2: Add variations
+        with metrics.stage('variations'):
+            self.add_variations_document(doc, rng)
+        
+        # Step 3: Restructure
+        if intensity > 0.5:
+            with metrics.stage('restructure'):
+                self.restructure_document(doc)
+        
+        # Step 4: Filter content for safety
+        doc.annotate(self.tagger)
+        with metrics.stage('content_filter'):
+            self.filter_document(doc)
+        
+        metrics.gauge('synonym_cache_hit_rate', self.synonym_cache.stats()['hit_rate'])
+        return doc
 
 
 class SemanticValidator:
@@ -426,19 +518,42 @@ class SemanticValidator:
     while being appropriately humanized.
     """
     
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, tagger=None, original_cache_size=DEFAULT_ORIGINAL_CACHE_SIZE, tokenizer=None):
+        self._tagger = tagger
+        # Scoring always uses one backend, so scores stay comparable across requests
+        self.tokenizer = get_tokenizer(tokenizer)
+        # Original text -> (its sorted key terms, word count)
+        self._originals = LRUCache(original_cache_size)
+    
+    @property
+    def tagger(self):
+        if self._tagger is None:
+            self._tagger = get_default_tagger()
+        return self._tagger
+    
+    @property
+    def stop_words(self):
+        return get_resources().stopwords()
     
     def extract_key_terms(self, text):
         """Extract key terms (nouns and important verbs) from text."""
-        tokens = word_tokenize(text.lower())
-        pos_tags = pos_tag(tokens)
-        
+        return self.extract_key_terms_batch([text])[0]
+    
+    def extract_key_terms_batch(self, texts):
+        """Extract key terms from several texts with one batched tagger call."""
+        tokenize = self.tokenizer.tokenize_text
+        batch = [tokenize(text.lower()) for text in texts]
+        return [self._key_terms(tagged) for tagged in self.tagger.tag_sents(batch)]
+    
+    def _key_terms(self, tagged_words):
+        """Collect key terms from (word, tag) pairs."""
+        stop_words = self.stop_words
         key_terms = set()
-        for word, pos in pos_tags:
+        for word, pos in tagged_words:
             # Keep nouns, verbs, and adjectives
             if pos in ['NN', 'NNS', 'VB', 'VBD', 'VBG', 'VBN', 'VBP', 'VBZ', 'JJ']:
-                if word not in self.stop_words and word.isalpha() and len(word) > 2:
+                word = word.lower()
+                if word not in stop_words and word.isalpha() and len(word) > 2:
                     key_terms.add(word)
         
         return key_terms
@@ -455,10 +570,125 @@ class SemanticValidator:
         Returns:
             Dictionary with similarity metrics and validation results
         """
-        # Extract key terms from both texts
-        original_terms = self.extract_key_terms(original_text)
-        paraphrased_terms = self.extract_key_terms(paraphrased_text)
+        return self.score_many(original_text, [paraphrased_text])[0]
+    
+    def score_many(self, original_text, candidates):
+        """
+        Score several candidate paraphrases of one original in one pass.
+        The original's key terms are cached, so rescoring it is cheap.
         
+        Args:
+            original_text: Original input text
+            candidates: Candidate paraphrased texts
+            
+        Returns:
+            One validation dict (as from calculate_semantic_similarity) per candidate
+        """
+        candidates = list(candidates)
+        original = self._originals.get(original_text)
+        texts = candidates if original is not None else [original_text] + candidates
+        terms = self.extract_key_terms_batch(texts) if texts else []
+        if original is None:
+            original = (sorted(terms.pop(0)), len(original_text.split()))
+            self._originals.put(original_text, original)
+        
+        # Terms are numbered per call, starting with the original's, so no
+        # vocabulary outlives the request
+        original_terms, original_length = original
+        vocabulary = {term: i for i, term in enumerate(original_terms)}
+        original_ids = np.arange(len(original_terms), dtype=np.int64)
+        return self._score_ids(original_terms, original_ids, original_length,
+                               [self._term_ids(vocabulary, candidate_terms) for candidate_terms in terms],
+                               [len(candidate.split()) for candidate in candidates])
+    
+    @staticmethod
+    def _term_ids(vocabulary, terms):
+        """Map key terms to a sorted array of IDs, numbering new terms in vocabulary."""
+        ids = np.fromiter((vocabulary.setdefault(term, len(vocabulary)) for term in terms),
+                          dtype=np.int64, count=len(terms))
+        ids.sort()
+        return ids
+    
+    def _score_ids(self, original_terms, original_ids, original_length, candidate_ids,
+                   candidate_lengths):
+        """
+        Compare one original's term IDs with every candidate's at once: all
+        candidate IDs are concatenated and tested against the original's
+        sorted IDs in one vectorized membership check. original_terms[i] is
+        the term with ID i.
+        """
+        if not candidate_ids:
+            return []
+        sizes = np.array([len(ids) for ids in candidate_ids], dtype=np.int64)
+        flat = np.concatenate(candidate_ids) if sizes.sum() else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(len(candidate_ids)), sizes)
+        present = np.isin(flat, original_ids)
+        preserved = np.bincount(rows[present], minlength=len(candidate_ids))
+        added = sizes - preserved
+        
+        original_count = len(original_ids)
+        if original_count:
+            scores = preserved / original_count * 100
+        else:
+            scores = np.full(len(candidate_ids), 100.0)
+        lengths = np.array(candidate_lengths, dtype=np.float64)
+        longest = np.maximum(lengths, original_length)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            length_ratios = np.where(longest > 0, np.minimum(lengths, original_length) / longest * 100, 100.0)
+        
+        reports = []
+        for row, ids in enumerate(candidate_ids):
+            missing = None
+            if preserved[row] < original_count:
+                missing_ids = original_ids[~np.isin(original_ids, ids, assume_unique=True)]
+                missing = [original_terms[i] for i in missing_ids]
+            reports.append(self._report(
+                float(scores[row]), float(length_ratios[row]), original_count,
+                int(preserved[row]), missing or [], int(added[row]),
+                original_length != candidate_lengths[row]
+            ))
+        return reports
+    
+    def validate_document(self, doc):
+        """
+        Calculate semantic similarity between the source of an annotated
+        document and its current text, reusing the document's tokens.
+        
+        Args:
+            doc: AnnotatedDocument that has been paraphrased/humanized
+            
+        Returns:
+            Dictionary with similarity metrics and validation results
+        """
+        doc.annotate(self.tagger)
+        
+        # The document's tags come from cased text, where capitalised words
+        # are NNP; key terms are taken from lowercased text, as in
+        # extract_key_terms, so both scores agree
+        sources = []
+        rewrites = []
+        for sentence in doc.sentences():
+            source = [token.lower() for token in sentence.source_tokens]
+            current = [token.lower() for token in sentence.tokens]
+            sources.append(source)
+            # None marks a sentence that still reads as its source
+            rewrites.append(current if current != source else None)
+        changed = [tokens for tokens in rewrites if tokens is not None]
+        tagged = self.tagger.tag_sents(sources + changed) if sources else []
+        
+        original_terms = set()
+        paraphrased_terms = set()
+        rewritten = iter(tagged[len(sources):])
+        for source_tagged, tokens in zip(tagged, rewrites):
+            source_terms = self._key_terms(source_tagged)
+            original_terms |= source_terms
+            paraphrased_terms |= source_terms if tokens is None else self._key_terms(next(rewritten))
+        
+        return self._compare(original_terms, paraphrased_terms,
+                             doc.source_word_count(), len(doc.render().split()))
+    
+    def _compare(self, original_terms, paraphrased_terms, original_length, paraphrased_length):
+        """Build the validation report from key term sets and word counts."""
         # Calculate overlap
         common_terms = original_terms.intersection(paraphrased_terms)
         if len(original_terms) == 0:
@@ -471,28 +701,33 @@ class SemanticValidator:
         added_terms = paraphrased_terms - original_terms
         
         # Calculate text length ratio (should be similar)
-        original_length = len(original_text.split())
-        paraphrased_length = len(paraphrased_text.split())
-        length_ratio = min(paraphrased_length, original_length) / max(paraphrased_length, original_length) * 100
+        longest = max(paraphrased_length, original_length)
+        length_ratio = min(paraphrased_length, original_length) / longest * 100 if longest else 100
         
+        is_humanized = paraphrased_length != original_length  # Should have some changes
+        return self._report(similarity_score, length_ratio, len(original_terms), len(common_terms),
+                            sorted(missing_terms), len(added_terms), is_humanized)
+    
+    def _report(self, similarity_score, length_ratio, original_count, preserved_count,
+                missing_terms, added_count, is_humanized):
+        """Assemble the validation dict (missing_terms sorted)."""
         # Overall assessment
         is_semantic_match = similarity_score >= 75  # 75% threshold for acceptable paraphrase
-        is_humanized = paraphrased_length != original_length  # Should have some changes
         
         return {
             'similarity_score': round(similarity_score, 2),
             'length_similarity': round(length_ratio, 2),
-            'original_key_terms': len(original_terms),
-            'preserved_terms': len(common_terms),
-            'missing_terms': list(missing_terms)[:5] if missing_terms else [],  # Show first 5
-            'new_terms_added': len(added_terms),
+            'original_key_terms': original_count,
+            'preserved_terms': preserved_count,
+            'missing_terms': missing_terms[:5],  # Show first 5 (stable order)
+            'new_terms_added': added_count,
             'semantic_match': is_semantic_match,
             'is_humanized': is_humanized,
             'quality_status': self._get_quality_status(similarity_score, is_humanized),
             'recommendations': self._get_recommendations(similarity_score, is_humanized, missing_terms)
         }
     
-    def improve_paraphrase(self, original_text, paraphrased_text, engine):
+    def improve_paraphrase(self, original_text, paraphrased_text, engine, seed=None, rng=None):
         """
         Intelligently improve paraphrased text based on validation results.
         Works internally without user interaction.
@@ -501,63 +736,112 @@ class SemanticValidator:
             original_text: Original input text
             paraphrased_text: Current paraphrased text
             engine: ParaphraserEngine instance to re-paraphrase if needed
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
             
         Returns:
             Improved paraphrased text
         """
-        validation = self.calculate_semantic_similarity(original_text, paraphrased_text)
-        
-        # If semantic match is good (>=75%) and humanized, return as-is
-        if validation['semantic_match'] and validation['is_humanized']:
+        with metrics.request('improve'):
+            metrics.count('tokens', len(paraphrased_text.split()))
+            with metrics.stage('validation'):
+                validation = self.calculate_semantic_similarity(original_text, paraphrased_text)
+            
+            # If semantic match is good (>=75%) and humanized, return as-is
+            if validation['semantic_match'] and validation['is_humanized']:
+                return paraphrased_text
+            
+            with metrics.stage('improve'):
+                # If similarity is too low, try to incorporate missing terms
+                if validation['similarity_score'] < 75 and validation['missing_terms']:
+                    improved = self._reincorporate_missing_terms(
+                        paraphrased_text, 
+                        validation['missing_terms']
+                    )
+                    return improved
+                
+                # If not humanized enough, apply more humanization
+                if not validation['is_humanized']:
+                    # Text is too similar - needs more changes
+                    # Re-paraphrase with slightly higher internal intensity
+                    rng = make_rng(seed, rng)
+                    improved = engine.replace_with_synonyms(paraphrased_text, intensity=0.4, rng=rng)
+                    improved = engine.add_variations(improved, rng=rng)
+                    return improved
+            
             return paraphrased_text
+    
+    def improve_document(self, doc, engine, seed=None, rng=None):
+        """
+        Improve an annotated document in place based on validation results.
+        Same strategy as improve_paraphrase, without re-tokenizing the text.
+        
+        Args:
+            doc: AnnotatedDocument that has been paraphrased/humanized
+            engine: ParaphraserEngine instance to re-paraphrase if needed
+            seed: Seed for reproducible output (None for fresh randomness)
+            rng: random.Random to draw from instead of seeding a new one
+            
+        Returns:
+            The same document, updated
+        """
+        if doc.is_blank:
+            return doc
         
-        # If similarity is too low, try to incorporate missing terms
-        if validation['similarity_score'] < 75 and validation['missing_terms']:
-            improved = self._reincorporate_missing_terms(
-                paraphrased_text, 
-                list(validation['missing_terms'])[:5]
-            )
-            return improved
+        with metrics.stage('validation'):
+            validation = self.validate_document(doc)
         
-        # If not humanized enough, apply more humanization
-        if not validation['is_humanized']:
-            # Text is too similar - needs more changes
-            # Re-paraphrase with slightly higher internal intensity
-            improved = engine.replace_with_synonyms(paraphrased_text, intensity=0.4)
-            improved = engine.add_variations(improved)
-            return improved
+        # If semantic match is good (>=75%) and humanized, return as-is
+        if validation['semantic_match'] and validation['is_humanized']:
+            return doc
+        
+        with metrics.stage('improve'):
+            # If similarity is too low, try to incorporate missing terms
+            if validation['similarity_score'] < 75 and validation['missing_terms']:
+                missing_terms = validation['missing_terms']
+                for sentence in doc.sentences():
+                    modified = self._insert_missing_term(sentence.text, missing_terms)
+                    if modified != sentence.text:
+                        sentence.update(modified)
+                return doc
+            
+            # If not humanized enough, apply more humanization
+            if not validation['is_humanized']:
+                rng = make_rng(seed, rng)
+                engine.replace_with_synonyms_document(doc, intensity=0.4, rng=rng)
+                engine.add_variations_document(doc, rng)
         
-        return paraphrased_text
+        return doc
     
     def _reincorporate_missing_terms(self, paraphrased_text, missing_terms):
         """
         Try to reincorporate important missing terms where they make sense.
         """
-        result = paraphrased_text
-        
         # Find sentences that might be missing the concepts
-        sentences = sent_tokenize(paraphrased_text)
-        modified_sentences = []
-        
-        for sentence in sentences:
-            modified = sentence
-            # Check each missing term
-            for term in missing_terms:
-                if term.lower() not in modified.lower() and len(modified) > 30:
-                    # This sentence could benefit from including this term
-                    # Try to add it naturally
-                    words = modified.split()
-                    if len(words) > 10:
-                        # Insert near the beginning or middle
-                        insert_pos = len(words) // 2
-                        words.insert(insert_pos, term)
-                        modified = ' '.join(words)
-                        break  # Only add one per sentence
-            
-            modified_sentences.append(modified)
+        sentences = self.tokenizer.split_sentences(paraphrased_text)
+        modified_sentences = [self._insert_missing_term(sentence, missing_terms)
+                              for sentence in sentences]
         
         return ' '.join(modified_sentences)
     
+    def _insert_missing_term(self, sentence, missing_terms):
+        """Insert at most one missing term into a sentence."""
+        modified = sentence
+        # Check each missing term
+        for term in missing_terms:
+            if term.lower() not in modified.lower() and len(modified) > 30:
+                # This sentence could benefit from including this term
+                # Try to add it naturally
+                words = modified.split()
+                if len(words) > 10:
+                    # Insert near the beginning or middle
+                    insert_pos = len(words) // 2
+                    words.insert(insert_pos, term)
+                    modified = ' '.join(words)
+                    break  # Only add one per sentence
+        
+        return modified
+    
     def _get_quality_status(self, similarity_score, is_humanized):
         """Determine quality status of paraphrase (internal only)."""
         if similarity_score < 60:
@@ -0,0 +1,386 @@
+"""
+Pipeline Module
+
+Runs the full paraphrase -> humanize -> improve pipeline over a document.
+Paragraphs are processed independently, so results can be streamed out as
+each paragraph completes instead of after the whole document is done. With a
+cache.ResultCache attached, repeated requests are answered from the cache,
+and with an EditSession only the paragraphs edited since the previous run
+are processed again. With BestOf, several independently seeded candidates
+are generated per paragraph and the validator picks the best one.
+"""
+
+import difflib
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import metrics
+from ai_avoider import AIDetectionAvoider
+from cache import result_key
+from document import split_paragraphs
+from paraphraser import ParaphraserEngine, SemanticValidator
+from seeding import derive_seed, make_rng
+from tokenization import get_tokenizer
+
+
+# Objective name -> sort key over a validation report (higher is better)
+OBJECTIVES = {
+    # Keep the meaning; prefer candidates that changed something
+    'similarity': lambda report: (report['similarity_score'], report['is_humanized']),
+    # Change as much as possible while still meaning the same thing
+    'change': lambda report: (report['semantic_match'], report['is_humanized'],
+                              report['new_terms_added'], report['similarity_score']),
+    # Stay closest to the original length
+    'length': lambda report: (report['length_similarity'], report['similarity_score']),
+}
+
+
+class BestOf:
+    """
+    Best-of-N generation settings: instead of patching one paraphrase
+    afterwards, generate several independently seeded candidates and keep
+    the one the validator ranks highest.
+    """
+
+    def __init__(self, candidates=4, budget=None, objective='similarity'):
+        """
+        Args:
+            candidates: Candidates generated per paragraph
+            budget: Seconds the whole request may spend generating; once
+                spent, paragraphs use the candidates finished so far (always
+                at least one) and the result is not cached
+            objective: Name in OBJECTIVES, or a function mapping a validation
+                report to a sortable score
+        """
+        if isinstance(objective, str) and objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        self.candidates = max(1, int(candidates))
+        self.budget = budget
+        self.objective = objective
+
+    def key(self):
+        """Identifies the settings in cache keys."""
+        name = self.objective if isinstance(self.objective, str) else self.objective.__name__
+        return f"best-of-{self.candidates}:{name}:{self.budget}"
+
+    def choose(self, reports):
+        """Index of the best report (the earliest one on ties)."""
+        score = OBJECTIVES[self.objective] if isinstance(self.objective, str) else self.objective
+        return max(range(len(reports)), key=lambda i: score(reports[i]))
+
+
+class EditSession:
+    """
+    The previous input and output of one user's edit-and-rerun loop.
+
+    Attributes:
+        reused: Paragraphs taken from the previous output on the last run
+        processed: Paragraphs that went through the pipeline on the last run
+    """
+
+    def __init__(self):
+        self.settings = None
+        self.paragraphs = []
+        self.outputs = []
+        self.reused = 0
+        self.processed = 0
+
+    def reusable(self, paragraphs, settings):
+        """
+        Diff paragraphs against the previous input and map each unchanged
+        paragraph's new index to its previous output. Nothing is reusable
+        if the settings differ from the previous run.
+        """
+        if settings != self.settings:
+            return {}
+        matcher = difflib.SequenceMatcher(None, self.paragraphs, paragraphs, autojunk=False)
+        reuse = {}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(i2 - i1):
+                    reuse[j1 + offset] = self.outputs[i1 + offset]
+        return reuse
+
+    def record(self, paragraphs, outputs, settings, reused):
+        self.settings = settings
+        self.paragraphs = list(paragraphs)
+        self.outputs = list(outputs)
+        self.reused = reused
+        self.processed = len(paragraphs) - reused
+
+    def clear(self):
+        self.__init__()
+
+
+class Pipeline:
+    """
+    The paraphrase -> humanize -> improve pipeline over shared engines.
+    """
+
+    def __init__(self, engine=None, avoider=None, validator=None, result_cache=None):
+        """
+        Args:
+            engine: ParaphraserEngine (created if None)
+            avoider: AIDetectionAvoider (created if None)
+            validator: SemanticValidator (created if None)
+            result_cache: Optional cache.ResultCache for whole-request results
+        """
+        self.engine = engine or ParaphraserEngine()
+        self.avoider = avoider or AIDetectionAvoider(tokenizer=self.engine.tokenizer)
+        self.validator = validator or SemanticValidator(tokenizer=self.engine.tokenizer)
+        self.result_cache = result_cache
+
+    def warm_up(self):
+        """Load every lazily loaded resource by running a short sample."""
+        self.process_paragraph("The engines are warming up before real work arrives.", 1.0)
+
+    def process_paragraph(self, paragraph, intensity=0.6, humanize=True, seed=None,
+                          best_of=None, deadline=None, tokenizer=None, fused=None):
+        """
+        Run every stage over a single paragraph.
+
+        Args:
+            paragraph: Paragraph text (no blank lines)
+            intensity: Strength of paraphrasing/humanization (0.0 to 1.0)
+            humanize: Apply AI-detection avoidance
+            seed: Request seed; the paragraph's own seed is derived from it
+                and its content, so a paragraph gets the same result whichever
+                worker processes it and wherever it sits in the document
+            best_of: Optional BestOf; generate candidates and keep the best
+                instead of improving a single paraphrase
+            deadline: time.monotonic() value after which no more candidates
+                are started
+            tokenizer: Tokenizer backend or its name (defaults to the engine's)
+            fused: Humanize in fused mode (None for the avoider's setting)
+
+        Returns:
+            The finished paragraph text
+        """
+        if best_of is not None and best_of.candidates > 1:
+            return self.best_candidate(paragraph, intensity, humanize, seed, best_of, deadline,
+                                       tokenizer, fused)
+
+        with metrics.request('pipeline'):
+            doc = self.engine.annotate(paragraph, line_fallback=False, tokenizer=tokenizer)
+            if doc.is_blank:
+                return ''
+            metrics.count('paragraphs')
+            metrics.count('sentences', doc.sentence_count())
+            metrics.count('tokens', doc.source_word_count())
+
+            rng = make_rng(None if seed is None else derive_seed(seed, paragraph))
+
+            self.engine.paraphrase_document(doc, intensity, rng=rng)
+            if humanize:
+                self.avoider.humanize_document(doc, intensity, rng=rng, fused=fused)
+            self.validator.improve_document(doc, self.engine, rng=rng)
+            return doc.render()
+
+    def candidate_seeds(self, paragraph, seed, count):
+        """
+        Seeds of a paragraph's candidates. The first is the seed a single
+        paraphrase would use, so best-of-1 gives the plain result.
+        """
+        if seed is None:
+            seed = make_rng().getrandbits(64)
+        return [derive_seed(seed, paragraph)] + [derive_seed(seed, paragraph, k) for k in range(1, count)]
+
+    def _generate(self, doc, intensity, humanize, seed, fused=None):
+        rng = make_rng(seed)
+        self.engine.paraphrase_document(doc, intensity, rng=rng)
+        if humanize:
+            self.avoider.humanize_document(doc, intensity, rng=rng, fused=fused)
+        return doc
+
+    def generate_candidate(self, source, intensity, humanize, seed, fused=None):
+        """
+        Paraphrase (and humanize) an annotated paragraph with a candidate seed.
+
+        Args:
+            source: The paragraph's AnnotatedDocument, or that document
+                pickled (as sent to pool workers); it is not modified
+        """
+        if isinstance(source, bytes):
+            source = pickle.loads(source)
+        if source.is_blank:
+            return ''
+        return self._generate(source.copy(), intensity, humanize, seed, fused).render()
+
+    def best_candidate(self, paragraph, intensity, humanize, seed, best_of, deadline=None,
+                       tokenizer=None, fused=None):
+        """
+        Generate best_of.candidates rewrites of one paragraph from a single
+        annotated copy of it, score them in one validator batch and return
+        the best.
+        """
+        with metrics.request('pipeline'):
+            source = self.engine.annotate(paragraph, line_fallback=False, tokenizer=tokenizer)
+            if source.is_blank:
+                return ''
+            metrics.count('paragraphs')
+            metrics.count('sentences', source.sentence_count())
+            metrics.count('tokens', source.source_word_count())
+
+            candidates = []
+            for candidate_seed in self.candidate_seeds(paragraph, seed, best_of.candidates):
+                if candidates and deadline is not None and time.monotonic() >= deadline:
+                    break
+                with metrics.stage('candidate'):
+                    doc = self._generate(source.copy(), intensity, humanize, candidate_seed, fused)
+                    candidates.append(doc.render())
+            metrics.count('candidates', len(candidates))
+
+            with metrics.stage('ranking'):
+                reports = self.validator.score_many(paragraph, candidates)
+            return candidates[best_of.choose(reports)]
+
+    def _pooled_best_of(self, paragraphs, intensity, humanize, seed, best_of, pool, deadline,
+                        tokenizer=None):
+        """
+        Annotate every paragraph once (one batched tagger call), fan its
+        candidates out over the pool with the annotated copy, then rank in
+        order.
+        """
+        fused = self.avoider.fused
+        docs = self.engine.annotate_many(paragraphs, line_fallback=False, tokenizer=tokenizer)
+        groups = []
+        for paragraph, doc in zip(paragraphs, docs):
+            if doc.is_blank:
+                groups.append(None)
+                continue
+            # Pickled once, so every candidate task ships the same bytes
+            source = pickle.dumps(doc, pickle.HIGHEST_PROTOCOL)
+            groups.append([pool.submit('candidate', source, intensity, humanize, candidate_seed, fused)
+                           for candidate_seed in self.candidate_seeds(paragraph, seed,
+                                                                      best_of.candidates)])
+        for paragraph, group in zip(paragraphs, groups):
+            if group is None:
+                yield ''
+                continue
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(group, timeout=timeout)
+            if not done:
+                done, pending = wait(group, return_when=FIRST_COMPLETED)
+            for future in pending:
+                future.cancel()
+            candidates = [future.result() for future in group if future in done]
+            reports = self.validator.score_many(paragraph, candidates)
+            yield candidates[best_of.choose(reports)]
+
+    def process_paragraphs(self, paragraphs, intensity=0.6, humanize=True, seed=None, pool=None,
+                           best_of=None, deadline=None, tokenizer=None):
+        """
+        Process a list of paragraphs, across the pool if one is given.
+
+        Yields:
+            Finished paragraphs in input order
+        """
+        if pool is not None:
+            # Workers fall back to their own default, so send the backend
+            # this pipeline resolves to (the one its results are keyed on)
+            tokenizer = get_tokenizer(tokenizer or self.engine.tokenizer).name
+        if pool is not None and best_of is not None and best_of.candidates > 1:
+            return self._pooled_best_of(paragraphs, intensity, humanize, seed, best_of, pool,
+                                        deadline, tokenizer)
+        if pool is not None:
+            return iter(pool.map_paragraphs(paragraphs, intensity, humanize, seed, tokenizer,
+                                            self.avoider.fused))
+        return (self.process_paragraph(paragraph, intensity, humanize, seed, best_of, deadline,
+                                       tokenizer)
+                for paragraph in paragraphs)
+
+    def stream(self, text, intensity=0.6, humanize=True, seed=None, pool=None, session=None,
+               best_of=None, tokenizer=None):
+        """
+        Yield each finished paragraph as soon as it has been through every stage.
+
+        Args:
+            text: Input text
+            intensity: Strength of paraphrasing/humanization (0.0 to 1.0)
+            humanize: Apply AI-detection avoidance
+            seed: Makes the output reproducible (None for fresh randomness)
+            pool: Optional parallel.EnginePool to spread paragraphs across
+                processes; output order and seeded results are unchanged
+            session: Optional EditSession; paragraphs unchanged since the
+                session's previous run (with the same settings) reuse their
+                previous output instead of being processed again
+            best_of: Optional BestOf; keep the best of several candidates
+                per paragraph (candidates run across the pool if given)
+            tokenizer: Tokenizer backend name for this request (defaults to
+                the engine's)
+
+        Yields:
+            Output paragraphs in input order; join them with blank lines for
+            the full result
+        """
+        if not text or not text.strip():
+            return
+
+        tokenizer_name = get_tokenizer(tokenizer or self.engine.tokenizer).name
+        data_version = f"{self.engine.data_version}:{tokenizer_name}"
+        if humanize and self.avoider.fused:
+            data_version = f"{data_version}:fused"
+        if best_of is not None:
+            data_version = f"{data_version}:{best_of.key()}"
+        paragraphs = [text[start:end] for start, end in split_paragraphs(text)]
+        settings = (intensity, humanize, seed, data_version)
+        deadline = None
+        if best_of is not None and best_of.budget is not None:
+            deadline = time.monotonic() + best_of.budget
+
+        key = None
+        if self.result_cache is not None:
+            key = result_key(text, intensity, humanize, seed, data_version)
+            cached = self.result_cache.get(key)
+            if cached is not None and len(cached) == len(paragraphs):
+                metrics.count('result_cache_hits')
+                if session is not None:
+                    session.record(paragraphs, cached, settings, len(paragraphs))
+                yield from cached
+                return
+
+        reuse = session.reusable(paragraphs, settings) if session is not None else {}
+        metrics.count('reused_paragraphs', len(reuse))
+        changed = [paragraph for i, paragraph in enumerate(paragraphs) if i not in reuse]
+        fresh = self.process_paragraphs(changed, intensity, humanize, seed, pool, best_of, deadline,
+                                        tokenizer)
+
+        finished = []
+        for i in range(len(paragraphs)):
+            result = reuse[i] if i in reuse else next(fresh)
+            finished.append(result)
+            yield result
+
+        if session is not None:
+            session.record(paragraphs, finished, settings, len(reuse))
+        # Once the budget has run out, paragraphs may have been ranked from
+        # fewer candidates than asked for, which depends on timing rather
+        # than on the seed, so the result is not cached
+        out_of_budget = deadline is not None and time.monotonic() >= deadline
+        if key is not None and not out_of_budget:
+            self.result_cache.put(key, finished)
+
+    def process_document(self, text, intensity=0.6, humanize=True, seed=None, tokenizer=None):
+        """
+        Run the pipeline over a whole document and score the result.
+
+        Returns:
+            Tuple of (output text, validation dict from
+            SemanticValidator.calculate_semantic_similarity)
+        """
+        output = self.run(text, intensity, humanize, seed, tokenizer=tokenizer)
+        if not text or not text.strip():
+            return output, None
+        return output, self.validator.calculate_semantic_similarity(text, output)
+
+    def run(self, text, intensity=0.6, humanize=True, seed=None, pool=None, session=None,
+            best_of=None, tokenizer=None):
+        """
+        Run the pipeline over a whole document and return the output text.
+        Paragraphs are validated and improved against their own source.
+        """
+        if not text or not text.strip():
+            return text
+        return '\n\n'.join(self.stream(text, intensity, humanize, seed, pool, session, best_of,
+                                      tokenizer))
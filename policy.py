@@ -0,0 +1,151 @@
+"""
+Lexical Policy Module
+
+Loads the word lists that steer synonym selection (skip words, banned
+replacements, advanced words) from lexical_policy.json, compiles them once
+into frozen sets shared by every engine in the process, and reloads them when
+the file changes so lists can be tuned without restarting Streamlit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexical_policy.json')
+
+# Seconds between checks of the policy file's modification time
+RELOAD_INTERVAL = 2.0
+
+
+def _word_set(value):
+    """Flatten a list, or a dict of commented groups of lists, into a frozenset."""
+    if isinstance(value, dict):
+        words = [word for group in value.values() for word in group]
+    else:
+        words = value or []
+    return frozenset(word.lower() for word in words)
+
+
+class LexicalPolicy:
+    """
+    Compiled, immutable word lists.
+
+    Attributes:
+        skip_words: Words never replaced
+        bad_replacements: Words never used as a replacement
+        advanced_words: Overly complex words kept out of output
+        version: Short digest of the lists, changes whenever they do
+    """
+
+    __slots__ = ('skip_words', 'bad_replacements', 'advanced_words', 'version')
+
+    def __init__(self, skip_words=(), bad_replacements=(), advanced_words=()):
+        self.skip_words = _word_set(skip_words)
+        self.bad_replacements = _word_set(bad_replacements)
+        self.advanced_words = _word_set(advanced_words)
+
+        digest = hashlib.blake2b(digest_size=8)
+        for words in (self.skip_words, self.bad_replacements, self.advanced_words):
+            digest.update('\n'.join(sorted(words)).encode('utf-8') + b'\0')
+        self.version = digest.hexdigest()
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Compile a policy from a JSON file.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If it is not valid JSON
+        """
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        return cls(data.get('skip_words'), data.get('bad_replacements'),
+                   data.get('advanced_words'))
+
+    def allows(self, synonym):
+        """True if synonym may be used as a replacement."""
+        lowered = synonym.lower()
+        return lowered not in self.skip_words and lowered not in self.bad_replacements
+
+
+class PolicyStore:
+    """
+    Holds the current LexicalPolicy for a file and swaps in a new one when the
+    file's modification time changes. A file that fails to parse is logged and
+    the previous policy stays active.
+    """
+
+    def __init__(self, path, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._policy = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def current(self):
+        """Return the active policy, reloading it first if the file has changed."""
+        now = time.monotonic()
+        if self._policy is not None and now - self._checked_at < self.reload_interval:
+            return self._policy
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if self._policy is None or mtime != self._mtime:
+                self._load(mtime)
+            return self._policy
+
+    def reload(self):
+        """Force a reload from disk and return the resulting policy."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            self._load(mtime)
+            self._checked_at = time.monotonic()
+            return self._policy
+
+    def _load(self, mtime):
+        try:
+            policy = LexicalPolicy.from_file(self.path)
+        except (OSError, ValueError) as e:
+            if self._policy is None:
+                raise
+            logger.warning("Keeping previous lexical policy; failed to load %s: %s", self.path, e)
+            self._mtime = mtime
+            return
+        if self._policy is not None and policy.version != self._policy.version:
+            logger.info("Reloaded lexical policy %s (version %s)", self.path, policy.version)
+        self._policy = policy
+        self._mtime = mtime
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_policy_store():
+    """Return the process-wide store for $PARAPHRASER_POLICY or lexical_policy.json."""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = PolicyStore(os.environ.get('PARAPHRASER_POLICY', DEFAULT_PATH))
+    return _default_store
+
+
+def get_policy():
+    """Return the current process-wide LexicalPolicy."""
+    return get_policy_store().current()
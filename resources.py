@@ -0,0 +1,208 @@
+"""
+Resource Manager Module
+
+Loads NLTK (tokenizer, tagger, corpora) and word-list resources lazily, the
+first time a stage needs them, and records how long each load took. Nothing
+is downloaded unless explicitly requested, so importing the pipeline modules
+has no side effects, and a missing resource fails fast with a clear error
+instead of stalling on a download while offline.
+"""
+
+import threading
+import time
+
+
+# Resource name -> nltk.data paths to look for, newest package name first
+NLTK_RESOURCES = {
+    'punkt': ('tokenizers/punkt_tab', 'tokenizers/punkt'),
+    'averaged_perceptron_tagger': ('taggers/averaged_perceptron_tagger_eng',
+                                   'taggers/averaged_perceptron_tagger'),
+    'wordnet': ('corpora/wordnet',),
+    'omw-1.4': ('corpora/omw-1.4',),
+    'stopwords': ('corpora/stopwords',),
+}
+
+# Resource name -> NLTK downloader packages that provide it
+DOWNLOAD_PACKAGES = {
+    'punkt': ('punkt', 'punkt_tab'),
+    'averaged_perceptron_tagger': ('averaged_perceptron_tagger', 'averaged_perceptron_tagger_eng'),
+    'wordnet': ('wordnet',),
+    'omw-1.4': ('omw-1.4',),
+    'stopwords': ('stopwords',),
+}
+
+_MISSING = object()
+
+
+class ResourceUnavailableError(LookupError):
+    """Raised when a required NLTK resource is not installed."""
+
+    def __init__(self, name):
+        self.name = name
+        paths = ', '.join(NLTK_RESOURCES.get(name, (name,)))
+        packages = ' '.join(DOWNLOAD_PACKAGES.get(name, (name,)))
+        super().__init__(
+            f"NLTK resource '{name}' is not installed (looked for {paths}). "
+            f"Install it with: python -m nltk.downloader {packages}"
+        )
+
+
+class ResourceManager:
+    """
+    Lazily locates, loads and caches shared resources.
+
+    Attributes:
+        load_times: Seconds spent loading each resource, by name
+    """
+
+    def __init__(self, data_paths=()):
+        """
+        Args:
+            data_paths: Extra directories to search for NLTK data
+        """
+        self.data_paths = list(data_paths)
+        self.load_times = {}
+        self._loaded = {}
+        self._lock = threading.RLock()
+
+    def _nltk(self):
+        import nltk
+        for path in self.data_paths:
+            if path not in nltk.data.path:
+                nltk.data.path.append(path)
+        return nltk
+
+    def add_data_path(self, path):
+        """Search an extra directory for NLTK data."""
+        if path not in self.data_paths:
+            self.data_paths.append(path)
+
+    def locate(self, name):
+        """
+        Return the path of an installed NLTK resource.
+
+        Raises:
+            ResourceUnavailableError: If no candidate path is installed
+        """
+        nltk = self._nltk()
+        for path in NLTK_RESOURCES[name]:
+            try:
+                return nltk.data.find(path)
+            except LookupError:
+                continue
+        raise ResourceUnavailableError(name)
+
+    def is_available(self, name):
+        try:
+            self.locate(name)
+        except ResourceUnavailableError:
+            return False
+        return True
+
+    def get(self, name, loader):
+        """
+        Return a loaded resource, calling loader() the first time.
+        The load time is recorded in load_times.
+        """
+        value = self._loaded.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            value = self._loaded.get(name, _MISSING)
+            if value is _MISSING:
+                start = time.perf_counter()
+                value = loader()
+                self.load_times[name] = time.perf_counter() - start
+                self._loaded[name] = value
+            return value
+
+    def stopwords(self):
+        """English stopwords as a frozenset."""
+        def load():
+            self.locate('stopwords')
+            from nltk.corpus import stopwords
+            return frozenset(stopwords.words('english'))
+        return self.get('stopwords', load)
+
+    def tagger(self):
+        """A loaded PerceptronTagger."""
+        def load():
+            self.locate('averaged_perceptron_tagger')
+            from nltk.tag import PerceptronTagger
+            return PerceptronTagger()
+        return self.get('averaged_perceptron_tagger', load)
+
+    def sentence_splitter(self):
+        """The Punkt sentence splitter used by nltk.sent_tokenize."""
+        def load():
+            self.locate('punkt')
+            try:
+                from nltk.tokenize import PunktTokenizer
+                return PunktTokenizer('english')
+            except ImportError:
+                return self._nltk().data.load('tokenizers/punkt/english.pickle')
+        return self.get('punkt', load)
+
+    def word_tokenizer(self):
+        """nltk.word_tokenize (needs no data when called with preserve_line=True)."""
+        def load():
+            self._nltk()
+            from nltk.tokenize import word_tokenize
+            return word_tokenize
+        return self.get('word_tokenizer', load)
+
+    def wordnet(self):
+        """The WordNet corpus reader, fully loaded."""
+        def load():
+            self.locate('wordnet')
+            from nltk.corpus import wordnet
+            wordnet.ensure_loaded()
+            return wordnet
+        return self.get('wordnet', load)
+
+    def profanity_words(self):
+        """better-profanity's word list (empty if the package is missing)."""
+        def load():
+            from content_filter import load_profanity_wordlist
+            return load_profanity_wordlist()
+        return self.get('profanity_wordlist', load)
+
+    def missing(self, names=None):
+        """Names of NLTK resources that are not installed."""
+        return [name for name in (names or NLTK_RESOURCES) if not self.is_available(name)]
+
+    def download(self, names=None, download_dir=None, quiet=True):
+        """
+        Explicitly download NLTK resources. This is the only method that
+        touches the network.
+
+        Args:
+            names: Resource names (defaults to every resource that is missing)
+            download_dir: Directory to download into (NLTK's default if None)
+            quiet: Suppress downloader output
+
+        Returns:
+            List of resources that are still missing afterwards
+        """
+        nltk = self._nltk()
+        if download_dir:
+            self.add_data_path(download_dir)
+            self._nltk()
+        for name in (names or self.missing()):
+            for package in DOWNLOAD_PACKAGES.get(name, (name,)):
+                nltk.download(package, download_dir=download_dir, quiet=quiet)
+        return self.missing(names)
+
+    def report(self):
+        """Per-resource load times in milliseconds, slowest first."""
+        return {name: round(seconds * 1000, 2) for name, seconds in
+                sorted(self.load_times.items(), key=lambda item: item[1], reverse=True)}
+
+
+_default_manager = ResourceManager()
+
+
+def get_resources():
+    """Return the process-wide ResourceManager."""
+    return _default_manager
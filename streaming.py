@@ -0,0 +1,190 @@
+"""
+Streaming File Module
+
+Runs the pipeline over input files too large to hold in memory comfortably.
+The input is memory-mapped and its paragraph boundaries are found lazily,
+paragraphs are pushed through the pipeline in bounded chunks, and each
+finished paragraph is written to the output file straight away. Memory use
+depends on the chunk size, not on the size of the file:
+
+    python streaming.py book.txt book.out.txt --workers 8 --seed 7
+
+Paragraphs are split exactly as document.split_paragraphs splits the decoded
+text, so the output matches Pipeline.run over the whole file.
+"""
+
+import argparse
+import contextlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+
+from pipeline import BestOf, Pipeline
+from tokenization import TOKENIZERS
+
+
+# Characters of input handed to the pipeline (or pool) at a time
+DEFAULT_CHUNK_CHARS = 256 * 1024
+
+_NON_SPACE = re.compile(rb'\S')
+# Line endings as text-mode reading sees them (each becomes one '\n'), and
+# the blank-line paragraph separator '\n\n' split_paragraphs uses
+_NEWLINE = rb'(?:\r\n|\r(?!\n)|\n)'
+_LINE_BREAK = re.compile(_NEWLINE)
+_BLANK_LINE = re.compile(_NEWLINE * 2)
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """Memory-map a file read-only (empty files give b'', which cannot be mapped)."""
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            yield data
+
+
+def is_blank_file(path):
+    with map_file(path) as data:
+        return _NON_SPACE.search(data) is None
+
+
+def iter_paragraphs(path, line_fallback=True):
+    """
+    Lazily yield the stripped paragraphs of a UTF-8 text file.
+
+    Args:
+        path: Input file
+        line_fallback: Split on single newlines when the file has no blank
+            lines (as split_paragraphs does)
+
+    Yields:
+        Paragraph texts, including empty ones between extra blank lines
+    """
+    with map_file(path) as data:
+        # Match text-mode reading, which turns every line ending into '\n',
+        # so files with mixed endings split as the decoded text would
+        separator = _BLANK_LINE
+        if line_fallback and separator.search(data) is None:
+            separator = _LINE_BREAK
+
+        position = 0
+        while True:
+            match = separator.search(data, position)
+            part = data[position:len(data) if match is None else match.start()]
+            yield part.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n').strip()
+            if match is None:
+                return
+            position = match.end()
+
+
+def chunk_paragraphs(paragraphs, max_chars=DEFAULT_CHUNK_CHARS):
+    """Group paragraphs into lists of about max_chars characters."""
+    chunk = []
+    size = 0
+    for paragraph in paragraphs:
+        chunk.append(paragraph)
+        size += len(paragraph)
+        if size >= max_chars:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def process_file(input_path, output_path, pipeline=None, intensity=0.6, humanize=True, seed=None,
+                 pool=None, best_of=None, chunk_chars=DEFAULT_CHUNK_CHARS, tokenizer=None):
+    """
+    Stream a file through the pipeline into output_path.
+
+    Args:
+        input_path: UTF-8 text file to read
+        output_path: File to write the result to
+        pipeline: Pipeline to use (a default one is built if None)
+        intensity: Strength of paraphrasing/humanization (0.0 to 1.0)
+        humanize: Apply AI-detection avoidance
+        seed: Makes the output reproducible (None for fresh randomness)
+        pool: Optional parallel.EnginePool; each chunk is spread across it
+        best_of: Optional BestOf; its budget applies to each chunk
+        chunk_chars: Characters of input processed at a time
+        tokenizer: Tokenizer backend name (None for the default)
+
+    Returns:
+        Dict with paragraph and character counts and elapsed seconds
+    """
+    started = time.perf_counter()
+    report = {'paragraphs': 0, 'chars_in': 0, 'chars_out': 0}
+
+    if is_blank_file(input_path):
+        # Blank input comes back unchanged, as from Pipeline.run
+        with open(input_path, encoding='utf-8') as source, \
+                open(output_path, 'w', encoding='utf-8') as out:
+            text = source.read()
+            out.write(text)
+        report['chars_in'] = report['chars_out'] = len(text)
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        return report
+
+    pipeline = pipeline or Pipeline()
+    with open(output_path, 'w', encoding='utf-8') as out:
+        for chunk in chunk_paragraphs(iter_paragraphs(input_path), chunk_chars):
+            deadline = None
+            if best_of is not None and best_of.budget is not None:
+                deadline = time.monotonic() + best_of.budget
+            results = pipeline.process_paragraphs(chunk, intensity, humanize, seed, pool,
+                                                  best_of, deadline, tokenizer)
+            for paragraph, result in zip(chunk, results):
+                if report['paragraphs']:
+                    out.write('\n\n')
+                    report['chars_out'] += 2
+                out.write(result)
+                report['paragraphs'] += 1
+                report['chars_in'] += len(paragraph)
+                report['chars_out'] += len(result)
+            out.flush()
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paraphrase and humanize a large file as a stream")
+    parser.add_argument('input', help="UTF-8 text file")
+    parser.add_argument('output', help="File to write the result to")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes")
+    parser.add_argument('--intensity', type=float, default=0.6)
+    parser.add_argument('--no-humanize', dest='humanize', action='store_false')
+    parser.add_argument('--seed', type=int, help="Seed for reproducible output")
+    parser.add_argument('--candidates', type=int, default=1,
+                        help="Candidates per paragraph; the best one is kept")
+    parser.add_argument('--tokenizer', choices=list(TOKENIZERS), help="Tokenizer backend (default: nltk)")
+    parser.add_argument('--chunk-kb', type=int, default=DEFAULT_CHUNK_CHARS // 1024,
+                        help="Input processed at a time, in thousands of characters")
+    args = parser.parse_args(argv)
+
+    best_of = BestOf(args.candidates) if args.candidates > 1 else None
+    pool = None
+    if args.workers > 1:
+        from parallel import EnginePool
+        pool = EnginePool(args.workers)
+    try:
+        report = process_file(args.input, args.output, intensity=args.intensity,
+                              humanize=args.humanize, seed=args.seed, pool=pool,
+                              best_of=best_of, chunk_chars=args.chunk_kb * 1024,
+                              tokenizer=args.tokenizer)
+    finally:
+        if pool is not None:
+            pool.close()
+    sys.stderr.write(json.dumps(report) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
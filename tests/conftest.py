@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resources import get_resources  # noqa: E402
+
+
+@pytest.fixture
+def nltk_data():
+    """Skip tests that run the engines when the NLTK data is not installed."""
+    missing = get_resources().missing()
+    if missing:
+        pytest.skip(f"NLTK data not installed: {', '.join(missing)}")
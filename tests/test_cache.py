@@ -0,0 +1,78 @@
+import itertools
+
+import cache as cache_module
+from cache import DiskCache, LRUCache, ResultCache, result_key
+
+
+def test_lru_evicts_least_recently_used_first():
+    cache = LRUCache(3)
+    for key in 'abc':
+        cache.put(key, key.upper())
+    cache.get('a')
+    cache.put('d', 'D')
+    cache.put('e', 'E')
+    assert 'b' not in cache and 'c' not in cache
+    assert [key for key in 'ade' if key in cache] == ['a', 'd', 'e']
+    assert cache.evictions == 2
+
+
+def test_lru_put_refreshes_existing_key():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 3)
+    cache.put('c', 4)
+    assert cache.get('a') == 3
+    assert 'b' not in cache
+
+
+def test_lru_stats_and_zero_size():
+    cache = LRUCache(1)
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b', 'missing') == 'missing'
+    assert cache.stats()['hit_rate'] == 0.5
+
+    disabled = LRUCache(0)
+    disabled.put('a', 1)
+    assert len(disabled) == 0
+
+
+def test_result_key_depends_on_every_input():
+    base = result_key('text', 0.6, True, 1, 'v1')
+    assert base == result_key('text', 0.6, True, 1, 'v1')
+    assert len({base, result_key('text!', 0.6, True, 1, 'v1'), result_key('text', 0.7, True, 1, 'v1'),
+                result_key('text', 0.6, False, 1, 'v1'), result_key('text', 0.6, True, None, 'v1'),
+                result_key('text', 0.6, True, 1, 'v2')}) == 6
+
+
+def test_disk_cache_persists_and_evicts_oldest(tmp_path, monkeypatch):
+    # Distinct access times, so the eviction order does not depend on the clock
+    clock = itertools.count()
+    monkeypatch.setattr(cache_module.time, 'time', lambda: next(clock))
+    path = str(tmp_path / 'results.sqlite')
+    cache = DiskCache(path, max_bytes=40)
+    cache.put('a', ['x' * 10])
+    cache.put('b', ['y' * 10])
+    cache.put('c', ['z' * 10])
+    assert len(cache) == 2
+    assert cache.get('a') is None
+    cache.close()
+
+    reopened = DiskCache(path, max_bytes=40)
+    assert reopened.get('b') == ['y' * 10]
+    assert reopened.get('c') == ['z' * 10]
+    reopened.close()
+
+
+def test_result_cache_promotes_disk_hits(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    ResultCache(path=path).put('key', ['paragraph'])
+
+    cache = ResultCache(path=path)
+    assert cache.get('key') == ['paragraph']
+    assert cache.get('key') == ['paragraph']
+    stats = cache.stats()
+    assert stats['disk_hits'] == 1
+    assert stats['hits'] == 1
+    assert stats['disk_size'] == 1
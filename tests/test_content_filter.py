@@ -0,0 +1,44 @@
+import pytest
+
+from content_filter import CENSOR_REPLACEMENT, get_default_filter
+from paraphraser import ParaphraserEngine
+from pipeline import Pipeline
+
+pytest.importorskip('better_profanity')
+
+LOOKALIKES = [
+    ("What an a$$hole he was.", "a$$hole"),
+    ("F*ck this.", "F*ck"),
+    ("It is sh1t.", "sh1t"),
+]
+
+
+@pytest.mark.parametrize('text, word', LOOKALIKES)
+def test_filter_text_censors_lookalikes(text, word):
+    censored, spans = get_default_filter().filter_text(text)
+    assert word not in censored
+    assert CENSOR_REPLACEMENT in censored and spans
+
+
+def test_filter_tokens_matches_gap_free_runs():
+    # "a$$hole" as the tokenizers split it, with the source spans
+    tokens = ['an', 'a', '$', '$', 'hole', '.']
+    spans = [(0, 2), (3, 4), (4, 5), (5, 6), (6, 10), (10, 11)]
+    filtered, changes = get_default_filter().filter_tokens(tokens, spans=spans)
+    assert filtered == ['an', CENSOR_REPLACEMENT, '', '', '', '.']
+    assert changes == [(1, 5, 'profanity')]
+
+
+@pytest.mark.parametrize('tokenizer', ['nltk', 'fast'])
+@pytest.mark.parametrize('text, word', LOOKALIKES)
+def test_pipeline_censors_lookalikes(nltk_data, tokenizer, text, word):
+    pipeline = Pipeline(ParaphraserEngine(lexicon=False))
+    output = pipeline.run(text, intensity=0.0, humanize=False, seed=1, tokenizer=tokenizer)
+    assert word not in output
+    assert CENSOR_REPLACEMENT in output
+
+
+def test_pipeline_keeps_symbols_between_words(nltk_data):
+    pipeline = Pipeline(ParaphraserEngine(lexicon=False))
+    text = "He paid $5 * 3 @ noon."
+    assert pipeline.run(text, intensity=0.0, humanize=False, seed=1) == text
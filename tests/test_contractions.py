@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from contractions import CONTRACTIONS, ContractionRewriter
+
+
+@pytest.mark.parametrize('contraction', sorted(CONTRACTIONS))
+def test_every_entry_round_trips(contraction):
+    rewriter = ContractionRewriter()
+    expanded = rewriter.expand(contraction)
+    assert expanded == CONTRACTIONS[contraction]
+    assert rewriter.contract(expanded) == contraction
+
+
+def test_round_trip_keeps_case_and_surrounding_text():
+    rewriter = ContractionRewriter()
+    text = "Don't stop. IT'S late, and we wouldn't know what's next."
+    expanded = rewriter.expand(text)
+    assert expanded == "Do not stop. IT IS late, and we would not know what is next."
+    assert rewriter.contract(expanded) == text
+
+
+def test_expand_accepts_curly_apostrophes_and_split_tokens():
+    rewriter = ContractionRewriter()
+    assert rewriter.expand("It isn’t done, they do n't care") == "It is not done, they do not care"
+
+
+def test_probability_zero_leaves_text_unchanged():
+    rewriter = ContractionRewriter()
+    text = "We do not know, and it's fine."
+    assert rewriter.expand(text, 0.0, random.Random(1)) == text
+    assert rewriter.contract(text, 0.0, random.Random(1)) == text
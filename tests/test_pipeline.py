@@ -0,0 +1,74 @@
+import pytest
+
+from pipeline import BestOf, EditSession, Pipeline
+
+SETTINGS = (0.6, True, 1, 'v1')
+
+
+def test_edit_session_reuses_unchanged_paragraphs():
+    session = EditSession()
+    assert session.reusable(['a', 'b'], SETTINGS) == {}
+    session.record(['a', 'b', 'c'], ['A', 'B', 'C'], SETTINGS, 0)
+    assert session.processed == 3
+
+    assert session.reusable(['a', 'new', 'b', 'c'], SETTINGS) == {0: 'A', 2: 'B', 3: 'C'}
+    assert session.reusable(['a', 'edited', 'c'], SETTINGS) == {0: 'A', 2: 'C'}
+    assert session.reusable(['a', 'b', 'c'], (0.7, True, 1, 'v1')) == {}
+
+
+def test_edit_session_counts_on_rerun(nltk_data):
+    pipeline = Pipeline()
+    session = EditSession()
+    text = "The first paragraph is here.\n\nThe second one follows.\n\nA third closes it."
+    first = pipeline.run(text, 0.6, seed=3, session=session)
+    assert (session.reused, session.processed) == (0, 3)
+
+    edited = text.replace("second one follows", "second one was edited")
+    second = pipeline.run(edited, 0.6, seed=3, session=session)
+    assert (session.reused, session.processed) == (2, 1)
+    assert second.split('\n\n')[0] == first.split('\n\n')[0]
+    assert second.split('\n\n')[2] == first.split('\n\n')[2]
+
+    pipeline.run(edited, 0.9, seed=3, session=session)
+    assert (session.reused, session.processed) == (0, 3)
+
+
+def _report(similarity, humanized=True, added=0, length=100.0):
+    return {'similarity_score': similarity, 'is_humanized': humanized, 'semantic_match': similarity >= 75,
+            'new_terms_added': added, 'length_similarity': length}
+
+
+def test_best_of_objectives_pick_their_candidate():
+    reports = [
+        _report(100.0, humanized=False, length=90.0),
+        _report(90.0, added=3, length=80.0),
+        _report(80.0, added=1, length=95.0),
+        _report(60.0, added=5, length=100.0),
+    ]
+    assert BestOf(objective='similarity').choose(reports) == 0
+    assert BestOf(objective='change').choose(reports) == 1
+    assert BestOf(objective='length').choose(reports) == 3
+    assert BestOf(objective=lambda report: -report['similarity_score']).choose(reports) == 3
+
+
+def test_best_of_prefers_earliest_on_ties_and_rejects_unknown_objectives():
+    assert BestOf().choose([_report(90.0), _report(90.0)]) == 0
+    with pytest.raises(ValueError):
+        BestOf(objective='shortest')
+
+
+def test_best_of_one_matches_plain_run(nltk_data):
+    pipeline = Pipeline()
+    text = "Large language models show important results. People use this method every day."
+    assert pipeline.run(text, 0.8, seed=9, best_of=BestOf(1)) == pipeline.run(text, 0.8, seed=9)
+
+
+def test_best_of_keeps_highest_ranked_candidate(nltk_data):
+    pipeline = Pipeline()
+    paragraph = "Large language models show important results. People use this method every day."
+    best_of = BestOf(4, objective='similarity')
+    seeds = pipeline.candidate_seeds(paragraph, 9, best_of.candidates)
+    candidates = [pipeline.generate_candidate(pipeline.engine.annotate(paragraph, line_fallback=False),
+                                              0.8, True, seed) for seed in seeds]
+    reports = pipeline.validator.score_many(paragraph, candidates)
+    assert pipeline.run(paragraph, 0.8, seed=9, best_of=best_of) == candidates[best_of.choose(reports)]
@@ -0,0 +1,43 @@
+import pytest
+
+from parallel import EnginePool
+from pipeline import BestOf, Pipeline
+from seeding import derive_seed, make_rng
+
+TEXT = """Large language models show important results. They don't always work quickly, and it's hard to say why.
+
+People use this method every day. It helps. The results are very important for the large teams that use it.
+
+Researchers were testing how quickly the people learn the method. Is this the best way?"""
+
+
+def test_derive_seed_is_stable_and_distinct():
+    assert derive_seed(7, 'paragraph') == derive_seed(7, 'paragraph')
+    assert derive_seed(7, 'paragraph') != derive_seed(7, 'other paragraph')
+    assert derive_seed(7, 'paragraph') != derive_seed(8, 'paragraph')
+    assert make_rng(3).random() == make_rng(3).random()
+
+
+@pytest.fixture
+def thread_pool(nltk_data):
+    with EnginePool(2, processes=False) as pool:
+        yield pool
+
+
+def test_seeded_run_is_repeatable(nltk_data):
+    pipeline = Pipeline()
+    assert pipeline.run(TEXT, 0.8, seed=11) == pipeline.run(TEXT, 0.8, seed=11)
+
+
+def test_serial_and_thread_pool_match(thread_pool):
+    pipeline = Pipeline()
+    serial = pipeline.run(TEXT, 0.8, seed=11)
+    assert serial != TEXT
+    assert pipeline.run(TEXT, 0.8, seed=11, pool=thread_pool) == serial
+
+
+def test_best_of_serial_and_thread_pool_match(thread_pool):
+    pipeline = Pipeline()
+    best_of = BestOf(3)
+    serial = pipeline.run(TEXT, 0.8, seed=5, best_of=best_of)
+    assert pipeline.run(TEXT, 0.8, seed=5, pool=thread_pool, best_of=best_of) == serial